@@ -1,11 +1,9 @@
 from __future__ import annotations
 
 import io
-import tempfile
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from pathlib import Path
 from typing import Dict, List, Optional
 
 from fastapi import Depends, FastAPI, Header, HTTPException, Query, status
@@ -24,10 +22,25 @@ from .auth import (
     verify_password,
     verify_token,
 )
-from .data_loader import Instance, Patient, PinnedSession, Room, TherapyInfo, Therapist
+from .data_loader import (
+    Instance,
+    Patient,
+    PinnedSession,
+    Room,
+    TherapyInfo,
+    Therapist,
+    intern_instance,
+)
 from .excel_writer import export_excel
 from .model import ObjectiveWeights, SchedulerModel, SolverOptions
-from .storage import BaseStorage, StorageError, get_storage, session_prefix, validate_id
+from .storage import (
+    BaseStorage,
+    StorageError,
+    encode_json,
+    get_storage,
+    session_prefix,
+    validate_id,
+)
 from .time_utils import DAY_ORDER, availability_to_blocks_per_day, range_to_block
 
 
@@ -237,12 +250,14 @@ def payload_to_instance(payload: EntitiesPayload) -> Instance:
         for r in payload.rooms
     ]
 
-    return Instance(
-        therapists=therapists,
-        patients=patients,
-        rooms=rooms,
-        specialties=specialties,
-        therapies=therapies,
+    return intern_instance(
+        Instance(
+            therapists=therapists,
+            patients=patients,
+            rooms=rooms,
+            specialties=specialties,
+            therapies=therapies,
+        )
     )
 
 
@@ -451,18 +466,28 @@ def run_solver_endpoint(req: RunRequest, user: AuthUser = Depends(get_current_us
         "finishedAt": finished_at,
     }
 
+    # Render the workbook in memory first: nothing is stored unless the export succeeds,
+    # so a failed export never leaves a partial schedule.xlsx behind.
+    excel_buffer = io.BytesIO()
     try:
-        storage.write_json(schedule_key, schedule_payload)
-        storage.write_json(meta_key, meta_payload)
+        export_excel(result.schedule, excel_buffer)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to export Excel: {exc}") from exc
+
+    try:
+        storage.write_many(
+            [
+                (schedule_key, encode_json(schedule_payload), "application/json"),
+                (meta_key, encode_json(meta_payload), "application/json"),
+                (
+                    excel_key,
+                    excel_buffer.getvalue(),
+                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                ),
+            ]
+        )
+        # Point latest.json at the run only once its artifacts are stored.
         storage.write_json(latest_key, {"sessionId": session_id, "updatedAt": finished_at})
-        with tempfile.TemporaryDirectory() as tmpdir:
-            excel_path = Path(tmpdir) / "schedule.xlsx"
-            export_excel(result.schedule, excel_path)
-            storage.write_bytes(
-                excel_key,
-                excel_path.read_bytes(),
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
     except (StorageError, OSError) as exc:
         raise HTTPException(status_code=500, detail=f"Failed to persist schedule: {exc}") from exc
 
@@ -472,10 +497,10 @@ def run_solver_endpoint(req: RunRequest, user: AuthUser = Depends(get_current_us
 @app.get("/api/entities", response_model=EntitiesPayload)
 def get_entities(user: AuthUser = Depends(get_current_user)) -> EntitiesPayload:
     key = resolve_entities_key(user.user_id)
-    if not storage.exists(key):
-        return EntitiesPayload()
     try:
-        payload = storage.read_json(key)
+        payload = storage.try_read_json(key)
+        if payload is None:
+            return EntitiesPayload()
         return EntitiesPayload.model_validate(payload)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Invalid entities payload: {exc}") from exc
@@ -498,18 +523,18 @@ def get_results(
 ) -> ScheduleResponse:
     if not session_id:
         latest_key = f"sessions/{user.user_id}/latest.json"
-        if not storage.exists(latest_key):
+        latest = storage.try_read_json(latest_key)
+        if latest is None:
             raise HTTPException(status_code=404, detail="No schedule found.")
-        latest = storage.read_json(latest_key)
         session_id = str(latest.get("sessionId", "")).strip()
     if not session_id:
         raise HTTPException(status_code=404, detail="No schedule found.")
 
     session_root = resolve_session_root(user.user_id, session_id)
     schedule_key = f"{session_root}/schedule.json"
-    if not storage.exists(schedule_key):
+    payload = storage.try_read_json(schedule_key)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Schedule not found.")
-    payload = storage.read_json(schedule_key)
     try:
         return ScheduleResponse(**payload)
     except Exception as exc:
@@ -534,32 +559,30 @@ def delete_run(session_id: str, user: AuthUser = Depends(get_current_user)) -> D
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     if not keys:
         raise HTTPException(status_code=404, detail="Run not found.")
-    for key in keys:
-        try:
-            storage.delete(key)
-        except StorageError as exc:
-            raise HTTPException(status_code=500, detail=str(exc)) from exc
+    try:
+        storage.delete_many(keys)
+    except StorageError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
 
     latest_key = f"sessions/{user.user_id}/latest.json"
-    if storage.exists(latest_key):
-        try:
-            latest = storage.read_json(latest_key)
-        except Exception:
-            latest = None
-        latest_id = str(latest.get("sessionId", "")).strip() if isinstance(latest, dict) else ""
-        if latest_id == session_id:
-            runs = list_run_summaries(user.user_id)
-            if runs:
-                updated_at = runs[0].finishedAt or runs[0].startedAt
-                try:
-                    storage.write_json(latest_key, {"sessionId": runs[0].sessionId, "updatedAt": updated_at})
-                except StorageError as exc:
-                    raise HTTPException(status_code=500, detail=str(exc)) from exc
-            else:
-                try:
-                    storage.delete(latest_key)
-                except StorageError as exc:
-                    raise HTTPException(status_code=500, detail=str(exc)) from exc
+    try:
+        latest = storage.try_read_json(latest_key)
+    except Exception:
+        latest = None
+    latest_id = str(latest.get("sessionId", "")).strip() if isinstance(latest, dict) else ""
+    if latest_id == session_id:
+        runs = list_run_summaries(user.user_id)
+        if runs:
+            updated_at = runs[0].finishedAt or runs[0].startedAt
+            try:
+                storage.write_json(latest_key, {"sessionId": runs[0].sessionId, "updatedAt": updated_at})
+            except StorageError as exc:
+                raise HTTPException(status_code=500, detail=str(exc)) from exc
+        else:
+            try:
+                storage.delete(latest_key)
+            except StorageError as exc:
+                raise HTTPException(status_code=500, detail=str(exc)) from exc
     return {"deleted": True}
 
 
@@ -570,19 +593,19 @@ def download_excel(
 ) -> StreamingResponse:
     if not session_id:
         latest_key = f"sessions/{user.user_id}/latest.json"
-        if not storage.exists(latest_key):
+        latest = storage.try_read_json(latest_key)
+        if latest is None:
             raise HTTPException(status_code=404, detail="No schedule found.")
-        latest = storage.read_json(latest_key)
         session_id = str(latest.get("sessionId", "")).strip()
     if not session_id:
         raise HTTPException(status_code=404, detail="No schedule found.")
 
     session_root = resolve_session_root(user.user_id, session_id)
     excel_key = f"{session_root}/schedule.xlsx"
-    if not storage.exists(excel_key):
+    payload = storage.try_read_bytes(excel_key)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Excel not generated yet.")
 
-    payload = storage.read_bytes(excel_key)
     headers = {"Content-Disposition": "attachment; filename=schedule.xlsx"}
     return StreamingResponse(
         io.BytesIO(payload),
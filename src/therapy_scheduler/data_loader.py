@@ -1,52 +1,53 @@
 from __future__ import annotations
 
 import json
+import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, FrozenSet, List, Set, Tuple
 
 from .time_utils import BLOCKS, DAY_ORDER, availability_to_blocks_per_day, range_to_block
 
 
-@dataclass
+@dataclass(slots=True)
 class Therapist:
     id: str
     specialties: Set[str]
-    availability: Dict[str, Set[int]]
+    availability: Dict[str, FrozenSet[int]]
 
 
-@dataclass
+@dataclass(slots=True)
 class Patient:
     id: str
     therapies: Dict[str, int]
-    availability: Dict[str, Set[int]]
+    availability: Dict[str, FrozenSet[int]]
     max_continuous_hours: int = 3
     no_same_day_therapies: Set[str] = field(default_factory=set)
     fixed_therapists: Dict[str, Dict[str, List[str]]] = field(default_factory=dict)
     pinned_sessions: Dict[str, List["PinnedSession"]] = field(default_factory=dict)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PinnedSession:
     day: str
     block: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Room:
     id: str
     therapies: Set[str]
     capacity: int
 
 
-@dataclass
+@dataclass(slots=True)
 class TherapyInfo:
     requirements: Dict[str, int]
     min_patients: int
     max_patients: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Instance:
     therapists: List[Therapist]
     patients: List[Patient]
@@ -132,11 +133,77 @@ def load_instance(path: Path) -> Instance:
     ]
 
     _validate_instance(therapists, patients, rooms, specialties, therapies)
+    return intern_instance(
+        Instance(
+            therapists=therapists,
+            patients=patients,
+            rooms=rooms,
+            specialties=specialties,
+            therapies=therapies,
+        )
+    )
+
+
+def intern_instance(instance: Instance) -> Instance:
+    """Return a copy whose id, day and specialty strings are interned.
+
+    The model builds dict keys from ids found in different places (room therapies,
+    patient requirements, fixed therapists...). Interning makes equal ids the same
+    object, so key comparisons short-circuit on identity.
+    """
+    intern = sys.intern
+    therapies = {
+        intern(therapy_id): TherapyInfo(
+            requirements={intern(spec): count for spec, count in info.requirements.items()},
+            min_patients=info.min_patients,
+            max_patients=info.max_patients,
+        )
+        for therapy_id, info in instance.therapies.items()
+    }
+    therapists = [
+        Therapist(
+            id=intern(therapist.id),
+            specialties={intern(spec) for spec in therapist.specialties},
+            availability={intern(day): blocks for day, blocks in therapist.availability.items()},
+        )
+        for therapist in instance.therapists
+    ]
+    patients = [
+        Patient(
+            id=intern(patient.id),
+            therapies={intern(tid): required for tid, required in patient.therapies.items()},
+            availability={intern(day): blocks for day, blocks in patient.availability.items()},
+            max_continuous_hours=patient.max_continuous_hours,
+            no_same_day_therapies={intern(tid) for tid in patient.no_same_day_therapies},
+            fixed_therapists={
+                intern(tid): {
+                    intern(spec): [intern(therapist_id) for therapist_id in ids]
+                    for spec, ids in fixed.items()
+                }
+                for tid, fixed in patient.fixed_therapists.items()
+            },
+            pinned_sessions={
+                intern(tid): [
+                    PinnedSession(day=intern(slot.day), block=slot.block) for slot in slots
+                ]
+                for tid, slots in patient.pinned_sessions.items()
+            },
+        )
+        for patient in instance.patients
+    ]
+    rooms = [
+        Room(
+            id=intern(room.id),
+            therapies={intern(tid) for tid in room.therapies},
+            capacity=room.capacity,
+        )
+        for room in instance.rooms
+    ]
     return Instance(
         therapists=therapists,
         patients=patients,
         rooms=rooms,
-        specialties=specialties,
+        specialties={intern(spec) for spec in instance.specialties},
         therapies=therapies,
     )
 
@@ -148,8 +215,8 @@ def _validate_instance(
     specialties: Set[str],
     therapies: Dict[str, TherapyInfo],
 ) -> None:
-    therapist_ids = {t.id for t in therapists}
-    if len(therapist_ids) != len(therapists):
+    therapist_by_id = {t.id: t for t in therapists}
+    if len(therapist_by_id) != len(therapists):
         raise ValueError("Therapist ids must be unique.")
 
     patient_ids = {p.id for p in patients}
@@ -206,13 +273,13 @@ def _validate_instance(
                         f"Patient {patient.id} repeats a fixed therapist for '{therapy_id}' ({specialty})."
                     )
                 for therapist in therapist_id:
-                    if therapist not in therapist_ids:
+                    therapist_obj = therapist_by_id.get(therapist)
+                    if therapist_obj is None:
                         raise ValueError(
                             f"Patient {patient.id} references unknown therapist '{therapist}' "
                             f"for therapy '{therapy_id}'."
                         )
-                    therapist_obj = next((t for t in therapists if t.id == therapist), None)
-                    if therapist_obj and specialty not in therapist_obj.specialties:
+                    if specialty not in therapist_obj.specialties:
                         raise ValueError(
                             f"Therapist '{therapist}' lacks specialty '{specialty}' "
                             f"for patient {patient.id} fixed therapist."
@@ -3,20 +3,20 @@ from __future__ import annotations
 from collections import defaultdict
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import BinaryIO, Dict, Iterable, List, Tuple, Union
 
 from openpyxl import Workbook
 
 from .time_utils import BLOCKS, DAY_ORDER, block_to_range, range_to_block
 
 
-@dataclass
+@dataclass(slots=True)
 class StaffMember:
     therapist_id: str
     specialty: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Session:
     therapy_id: str
     room_id: str
@@ -66,7 +66,8 @@ def _render_cell(session: Session) -> str:
     )
 
 
-def export_excel(schedule: List[Dict[str, object]], output_path: Path) -> None:
+def export_excel(schedule: List[Dict[str, object]], output_path: Union[Path, BinaryIO]) -> None:
+    # output_path may also be an open binary stream, e.g. a storage upload.
     sessions = parse_sessions(schedule)
     wb = Workbook()
     wb.remove(wb.active)
@@ -75,7 +76,8 @@ def export_excel(schedule: List[Dict[str, object]], output_path: Path) -> None:
     _add_therapist_tab(wb, sessions)
     _add_patient_tab(wb, sessions)
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(output_path, Path):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
     wb.save(output_path)
 
 
@@ -1,8 +1,29 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Set, Tuple
-
+import hashlib
+import json
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import (
+    Callable,
+    DefaultDict,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+import ortools
+from google.protobuf import text_format
 from ortools.sat.python import cp_model
 
 from .data_loader import Instance, Patient, Room, TherapyInfo, Therapist
@@ -12,21 +33,154 @@ from .time_utils import BLOCKS, DAY_ORDER, block_to_range, consecutive_segments
 PatientSessionKey = Tuple[str, str, str, str, int]
 SessionKey = Tuple[str, str, str, int]
 StaffingKey = Tuple[str, str, str, str, int, str]
+AssumptionLabel = Tuple[object, ...]
+BaseVariables = Tuple[
+    Dict[SessionKey, cp_model.IntVar],
+    Dict[PatientSessionKey, cp_model.IntVar],
+    Dict[StaffingKey, cp_model.IntVar],
+]
+
+_DAY_INDEX: Dict[str, int] = {day: idx for idx, day in enumerate(DAY_ORDER)}
+# Block windows derived once from the fixed day layout: 4-block sliding windows for the
+# continuous-hours limit and (previous, current, next) triples for idle-gap detection.
+_WINDOWS_OF_4: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(segment[idx : idx + 4])
+    for segment in consecutive_segments()
+    for idx in range(len(segment) - 3)
+)
+_IDLE_TRIPLES: Tuple[Tuple[int, int, int], ...] = tuple(
+    (segment[idx - 1], segment[idx], segment[idx + 1])
+    for segment in consecutive_segments()
+    for idx in range(1, len(segment) - 1)
+)
+# Diagnostic methods backed by a CP-SAT solve, cached on disk per instance fingerprint.
+_CACHED_DIAGNOSTICS = ("assumptions", "soft")
+# Any change to the diagnostic models or their message format must bump this, or stale
+# cache entries keep being served.
+_DIAGNOSTICS_CACHE_VERSION = 2
+# Only solves that reached this status are worth caching; timeouts are retried.
+_DEFINITIVE_STATUS: Dict[str, int] = {
+    "assumptions": cp_model.INFEASIBLE,
+    "soft": cp_model.OPTIMAL,
+}
+# Assumption API names differ across OR-Tools releases; resolve them once at import.
+_ADD_ASSUMPTIONS_NAME: Optional[str] = next(
+    (name for name in ("add_assumptions", "AddAssumptions") if hasattr(cp_model.CpModel, name)),
+    None,
+)
+_ASSUMPTION_CORE_NAME: Optional[str] = next(
+    (
+        name
+        for name in (
+            "sufficient_assumptions_for_infeasibility",
+            "SufficientAssumptionsForInfeasibility",
+        )
+        if hasattr(cp_model.CpSolver, name)
+    ),
+    None,
+)
+
+
+def _format_slack_requirement(key: Tuple, value: int) -> str:
+    patient_id, therapy_id = key
+    return f"Patient {patient_id} missing {value} session(s) of therapy '{therapy_id}'."
+
+
+def _format_slack_no_same_day(key: Tuple, value: int) -> str:
+    patient_id, therapy_id, day = key
+    return (
+        f"Patient {patient_id} needs {value} extra '{therapy_id}' session(s) on {day} (no_same_day)."
+    )
+
+
+def _format_slack_session_min(key: Tuple, value: int) -> str:
+    therapy_id, room_id, day, block = key
+    return (
+        f"Session {therapy_id} in room {room_id} {day} {block_to_range(block)} "
+        f"short {value} patient(s) vs minimum."
+    )
+
+
+def _format_slack_session_max(key: Tuple, value: int) -> str:
+    therapy_id, room_id, day, block = key
+    return (
+        f"Session {therapy_id} in room {room_id} {day} {block_to_range(block)} "
+        f"over capacity by {value} patient(s)."
+    )
+
+
+def _format_slack_staffing(key: Tuple, value: int) -> str:
+    therapy_id, room_id, day, block, specialty = key
+    return (
+        f"Need +{value} '{specialty}' staff for therapy {therapy_id} "
+        f"in room {room_id} {day} {block_to_range(block)}."
+    )
+
 
+def _format_slack_fixed_therapist(key: Tuple, value: int) -> str:
+    patient_id, therapy_id, specialty, therapist_id = key
+    return (
+        f"Patient {patient_id} needs therapist {therapist_id} for '{therapy_id}' "
+        f"({specialty}), but {value} session(s) violate that requirement."
+    )
 
-@dataclass
+
+_SLACK_FORMATTERS: Dict[str, Callable[[Tuple, int], str]] = {
+    "patient_requirement": _format_slack_requirement,
+    "no_same_day": _format_slack_no_same_day,
+    "session_min": _format_slack_session_min,
+    "session_max": _format_slack_session_max,
+    "staffing": _format_slack_staffing,
+    "fixed_therapist": _format_slack_fixed_therapist,
+}
+
+
+def _json_default(value: object) -> object:
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Unsupported type for fingerprint: {type(value).__name__}")
+
+
+@dataclass(slots=True)
 class ObjectiveWeights:
     patient_days_weight: int = 1
     therapist_idle_gap_weight: int = 1
 
 
-@dataclass
+@dataclass(slots=True)
 class SolverOptions:
     time_limit: float = 30.0
     log_search_progress: bool = False
-
-
-@dataclass
+    # Parallel search workers; None keeps the CP-SAT default (one per available core).
+    num_workers: Optional[int] = None
+    # Optional CP-SAT portfolio hedging, e.g. ["max_lp", "core"].
+    extra_subsolvers: List[str] = field(default_factory=list)
+    # Optional cp_model.SatParameters.SearchBranching value; None keeps the solver default.
+    search_branching: Optional[int] = None
+    # Optional CP-SAT tuning levers; None keeps the solver default.
+    linearization_level: Optional[int] = None
+    cp_model_probing_level: Optional[int] = None
+    symmetry_level: Optional[int] = None
+    cp_model_presolve: Optional[bool] = None
+    optimize_with_core: Optional[bool] = None
+    boolean_encoding_level: Optional[int] = None
+    use_lns_only: Optional[bool] = None
+    # Stop once the objective is within this relative gap of the bound, e.g. 0.01.
+    relative_gap_limit: Optional[float] = None
+    # Seed the search with a greedy schedule via solution hints.
+    greedy_hint: bool = False
+    # Branch on session_active first, closing sessions before opening them. Only workers
+    # running fixed search follow it (e.g. search_branching=FIXED_SEARCH).
+    session_decision_strategy: bool = False
+    # Optional SatParameters text-format file (e.g. produced by an offline tuning run);
+    # the explicit options above take precedence over it.
+    tuned_params_path: Optional[str] = None
+    # Opt-in on-disk cache for the assumptions/soft diagnostics, keyed by an instance
+    # fingerprint. Entries hold patient/therapist ids, so None (the default) disables it.
+    diagnostics_cache_dir: Optional[str] = None
+
+
+@dataclass(slots=True)
 class SolveResult:
     status: str
     objective_value: float
@@ -38,36 +192,60 @@ class SolveResult:
 def build_base_variables(
     model: cp_model.CpModel,
     instance: Instance,
-) -> Tuple[
-    Dict[SessionKey, cp_model.IntVar],
-    Dict[PatientSessionKey, cp_model.IntVar],
-    Dict[StaffingKey, cp_model.IntVar],
-]:
+    named: bool = True,
+) -> BaseVariables:
     session_active: Dict[SessionKey, cp_model.IntVar] = {}
     patient_sessions: Dict[PatientSessionKey, cp_model.IntVar] = {}
     staffing: Dict[StaffingKey, cp_model.IntVar] = {}
 
-    def get_session_var(therapy_id: str, room_id: str, day: str, block: int) -> cp_model.IntVar:
-        key = (therapy_id, room_id, day, block)
-        if key not in session_active:
-            session_active[key] = model.NewBoolVar(f"s_{therapy_id}_{room_id}_{day}_{block}")
-        return session_active[key]
+    # (therapy, day) -> block -> [(room, session var)], in room order, so the patient
+    # loop reuses the sessions without rebuilding a 4-tuple key per room.
+    sessions_by_therapy_day: Dict[
+        Tuple[str, str], DefaultDict[int, List[Tuple[Room, cp_model.IntVar]]]
+    ] = {}
+
+    # Rooms allowed per therapy and qualified therapists per specialty, in instance order.
+    rooms_by_therapy: DefaultDict[str, List[Room]] = defaultdict(list)
+    for room in instance.rooms:
+        for therapy_id in room.therapies:
+            rooms_by_therapy[therapy_id].append(room)
+    therapists_by_specialty: DefaultDict[str, List[Therapist]] = defaultdict(list)
+    for therapist in instance.therapists:
+        for specialty in therapist.specialties:
+            therapists_by_specialty[specialty].append(therapist)
 
     for therapy_id, therapy in instance.therapies.items():
-        for room in instance.rooms:
-            if therapy_id not in room.therapies:
-                continue
+        # Per day: each required specialty with its therapists available that day and
+        # their block sets, so the block loop only does set membership tests.
+        candidates_by_day: Dict[str, List[Tuple[str, List[Tuple[Therapist, Set[int]]]]]] = {
+            day: [
+                (
+                    specialty,
+                    [
+                        (therapist, therapist.availability[day])
+                        for therapist in therapists_by_specialty.get(specialty, ())
+                        if day in therapist.availability
+                    ],
+                )
+                for specialty in therapy.requirements
+            ]
+            for day in DAY_ORDER
+        }
+        for room in rooms_by_therapy.get(therapy_id, ()):
             for day in DAY_ORDER:
+                day_sessions = sessions_by_therapy_day.setdefault(
+                    (therapy_id, day), defaultdict(list)
+                )
                 for block in BLOCKS:
-                    session_var = get_session_var(therapy_id, room.id, day, block)
-                    for specialty in therapy.requirements.keys():
-                        for therapist in instance.therapists:
-                            if specialty not in therapist.specialties:
-                                continue
-                            if (
-                                day not in therapist.availability
-                                or block not in therapist.availability[day]
-                            ):
+                    # Variable names only show up in solver logs; skip formatting them otherwise.
+                    session_var = model.NewBoolVar(
+                        f"s_{therapy_id}_{room.id}_{day}_{block}" if named else ""
+                    )
+                    session_active[(therapy_id, room.id, day, block)] = session_var
+                    day_sessions[block].append((room, session_var))
+                    for specialty, candidates in candidates_by_day[day]:
+                        for therapist, available_blocks in candidates:
+                            if block not in available_blocks:
                                 continue
                             staff_key = (
                                 therapist.id,
@@ -81,36 +259,42 @@ def build_base_variables(
                                 continue
                             staff_var = model.NewBoolVar(
                                 f"t_{therapist.id}_{therapy_id}_{room.id}_{day}_{block}_{specialty}"
+                                if named
+                                else ""
                             )
                             staffing[staff_key] = staff_var
-                            model.Add(staff_var <= session_var)
+                            model.AddImplication(staff_var, session_var)
 
     for patient in instance.patients:
-        pinned_by_therapy: Dict[str, Dict[str, Set[int]]] = {}
+        pinned_by_therapy: DefaultDict[str, DefaultDict[str, Set[int]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
         for therapy_id, slots in patient.pinned_sessions.items():
             for slot in slots:
-                pinned_by_therapy.setdefault(therapy_id, {}).setdefault(
-                    slot.day, set()
-                ).add(slot.block)
+                pinned_by_therapy[therapy_id][slot.day].add(slot.block)
         for therapy_id, required in patient.therapies.items():
             if required <= 0:
                 continue
             for day in DAY_ORDER:
-                blocks = set(patient.availability.get(day, set()))
-                blocks.update(pinned_by_therapy.get(therapy_id, {}).get(day, set()))
-                if not blocks:
+                blocks = patient.availability.get(day, frozenset())
+                pinned_blocks = pinned_by_therapy.get(therapy_id, {}).get(day)
+                if pinned_blocks:
+                    blocks = blocks | pinned_blocks
+                day_sessions = sessions_by_therapy_day.get((therapy_id, day))
+                if not blocks or day_sessions is None:
                     continue
                 for block in blocks:
-                    for room in instance.rooms:
-                        if therapy_id not in room.therapies:
-                            continue
-                        session_var = get_session_var(therapy_id, room.id, day, block)
-                        var_name = f"x_{patient.id}_{therapy_id}_{room.id}_{day}_{block}"
+                    for room, session_var in day_sessions[block]:
+                        var_name = (
+                            f"x_{patient.id}_{therapy_id}_{room.id}_{day}_{block}"
+                            if named
+                            else ""
+                        )
                         assign_var = model.NewBoolVar(var_name)
                         patient_sessions[
                             (patient.id, therapy_id, room.id, day, block)
                         ] = assign_var
-                        model.Add(assign_var <= session_var)
+                        model.AddImplication(assign_var, session_var)
 
     return session_active, patient_sessions, staffing
 
@@ -127,12 +311,38 @@ class SchedulerModel:
         self.solver_options = solver_options
         self.model = cp_model.CpModel()
         self.diagnostic_mode: Optional[str] = None
+        self._rooms_by_id: Dict[str, Room] = {room.id: room for room in instance.rooms}
+        self._therapists_by_id: Dict[str, Therapist] = {
+            therapist.id: therapist for therapist in instance.therapists
+        }
         # patient_sessions[(patient, therapy, room, day, block)] == 1 if patient attends that therapy session.
         self.patient_sessions: Dict[PatientSessionKey, cp_model.IntVar] = {}
         # session_active[(therapy, room, day, block)] == 1 if the therapy session is opened.
         self.session_active: Dict[SessionKey, cp_model.IntVar] = {}
         # staffing[(therapist, therapy, room, day, block, specialty)] == 1 if therapist staffs that role.
         self.staffing: Dict[StaffingKey, cp_model.IntVar] = {}
+        # Grouped views of patient_sessions / staffing, filled by _build_variables.
+        self._psess_by_session: DefaultDict[
+            SessionKey, List[Tuple[str, cp_model.IntVar]]
+        ] = defaultdict(list)
+        self._staff_by_session: DefaultDict[
+            SessionKey, List[Tuple[str, str, cp_model.IntVar]]
+        ] = defaultdict(list)
+        self._sessions_by_patient_day: DefaultDict[
+            Tuple[str, str], List[cp_model.IntVar]
+        ] = defaultdict(list)
+        self._sessions_by_patient_slot: DefaultDict[
+            Tuple[str, str, int], List[Tuple[str, cp_model.IntVar]]
+        ] = defaultdict(list)
+        self._sessions_by_patient_therapy: DefaultDict[
+            Tuple[str, str], List[Tuple[str, str, int, cp_model.IntVar]]
+        ] = defaultdict(list)
+        self._staff_by_therapist_slot: DefaultDict[
+            Tuple[str, str, int], List[cp_model.IntVar]
+        ] = defaultdict(list)
+        self._sessions_by_room_slot: DefaultDict[
+            Tuple[str, str, int], List[cp_model.IntVar]
+        ] = defaultdict(list)
         # patient_day_used[(patient, day)] == 1 if the patient has any session that day (feeds objective).
         self.patient_day_used: Dict[Tuple[str, str], cp_model.IntVar] = {}
         # therapist_busy[(therapist, day, block)] == 1 if therapist works that block (used to spot idle gaps).
@@ -140,8 +350,9 @@ class SchedulerModel:
         # idle_gaps collects variables marking single-block idle gaps surrounded by work.
         self.idle_gaps: List[cp_model.IntVar] = []
         # Assumptions for infeasibility explanations (diagnostic mode).
-        self.assumptions: Dict[str, cp_model.IntVar] = {}
-        self.assumption_index_to_label: Dict[int, str] = {}
+        # Keyed by structured labels such as ("patient_requirement", patient_id, therapy_id).
+        self.assumptions: Dict[AssumptionLabel, cp_model.IntVar] = {}
+        self.assumption_index_to_label: Dict[int, AssumptionLabel] = {}
         # Soft constraint slacks (diagnostic mode).
         self.slack_patient_requirements: Dict[Tuple[str, str], cp_model.IntVar] = {}
         self.slack_no_same_day: Dict[Tuple[str, str, str], cp_model.IntVar] = {}
@@ -151,16 +362,52 @@ class SchedulerModel:
         self.slack_fixed_therapist: Dict[
             Tuple[str, str, str, str], List[cp_model.IntVar]
         ] = {}
+        # Base variables shared (via model cloning) by the diagnostic models.
+        self._diagnostic_skeleton: Optional[Tuple[cp_model.CpModel, BaseVariables]] = None
+        # Proto sizes (variables, constraints) right after build_base_variables.
+        self._base_proto_sizes: Optional[Tuple[int, int]] = None
 
     def solve(self) -> SolveResult:
         self.diagnostic_mode = None
         self._build_variables()
         self._add_constraints()
         self._add_objective()
+        if self.solver_options.greedy_hint:
+            self._add_greedy_hints()
+        if self.solver_options.session_decision_strategy and self.session_active:
+            self.model.AddDecisionStrategy(
+                list(self.session_active.values()),
+                cp_model.CHOOSE_FIRST,
+                cp_model.SELECT_MIN_VALUE,
+            )
 
         solver = cp_model.CpSolver()
+        if self.solver_options.tuned_params_path:
+            text_format.Parse(
+                Path(self.solver_options.tuned_params_path).read_text(encoding="utf-8"),
+                solver.parameters,
+            )
         solver.parameters.max_time_in_seconds = self.solver_options.time_limit
         solver.parameters.log_search_progress = self.solver_options.log_search_progress
+        if self.solver_options.num_workers is not None:
+            solver.parameters.num_search_workers = self.solver_options.num_workers
+        if self.solver_options.extra_subsolvers:
+            solver.parameters.extra_subsolvers.extend(self.solver_options.extra_subsolvers)
+        if self.solver_options.search_branching is not None:
+            solver.parameters.search_branching = self.solver_options.search_branching
+        for name in (
+            "linearization_level",
+            "cp_model_probing_level",
+            "symmetry_level",
+            "cp_model_presolve",
+            "optimize_with_core",
+            "boolean_encoding_level",
+            "use_lns_only",
+            "relative_gap_limit",
+        ):
+            value = getattr(self.solver_options, name)
+            if value is not None:
+                setattr(solver.parameters, name, value)
 
         status_code = solver.Solve(self.model)
         status_name = self._status_name(status_code)
@@ -169,51 +416,59 @@ class SchedulerModel:
         diagnostics: List[str] = []
         diagnostics_by_method: Dict[str, List[str]] = {}
         if status_code in (cp_model.FEASIBLE, cp_model.OPTIMAL):
-            for (therapy_id, room_id, day, block), session_var in self.session_active.items():
-                if solver.Value(session_var) != 1:
-                    continue
+            # Index the raw response vector directly; all extracted vars are plain BoolVars.
+            solution = solver.ResponseProto().solution
+
+            def bool_value(var: cp_model.IntVar) -> bool:
+                return solution[var.Index()] != 0
+
+            psess_by_session = self._psess_by_session
+            staff_by_session = self._staff_by_session
+            # Pick active sessions with one vectorized gather instead of testing every key.
+            session_keys = list(self.session_active)
+            session_indices = np.fromiter(
+                (var.Index() for var in self.session_active.values()),
+                dtype=np.int64,
+                count=len(session_keys),
+            )
+            active = np.flatnonzero(
+                np.asarray(solution, dtype=np.int64)[session_indices]
+            )
+            # Decorate with the sort key while extracting; block order matches time order.
+            decorated: List[Tuple[int, int, str, str, Dict[str, object]]] = []
+            for pos in active:
+                key = session_keys[pos]
+                therapy_id, room_id, day, block = key
                 patient_ids = [
-                    pid
-                    for (pid, tid, rid, d, b), var in self.patient_sessions.items()
-                    if tid == therapy_id and rid == room_id and d == day and b == block and solver.Value(var) == 1
+                    pid for pid, var in psess_by_session.get(key, ()) if bool_value(var)
                 ]
                 staff = [
                     {"therapist_id": therapist_id, "specialty": specialty}
-                    for (
-                        therapist_id,
-                        tid,
-                        rid,
-                        d,
-                        b,
-                        specialty,
-                    ), var in self.staffing.items()
-                    if tid == therapy_id
-                    and rid == room_id
-                    and d == day
-                    and b == block
-                    and solver.Value(var) == 1
+                    for therapist_id, specialty, var in staff_by_session.get(key, ())
+                    if bool_value(var)
                 ]
-                schedule.append(
-                    {
-                        "therapy_id": therapy_id,
-                        "room_id": room_id,
-                        "day": day,
-                        "time": block_to_range(block),
-                        "patient_ids": sorted(patient_ids),
-                        "staff": sorted(
-                            staff,
-                            key=lambda item: (item["specialty"], item["therapist_id"]),
-                        ),
-                    }
-                )
-            schedule.sort(
-                key=lambda item: (
-                    DAY_ORDER.index(str(item["day"])),
-                    str(item["time"]),
-                    str(item["room_id"]),
-                    str(item["therapy_id"]),
+                decorated.append(
+                    (
+                        _DAY_INDEX[day],
+                        block,
+                        room_id,
+                        therapy_id,
+                        {
+                            "therapy_id": therapy_id,
+                            "room_id": room_id,
+                            "day": day,
+                            "time": block_to_range(block),
+                            "patient_ids": sorted(patient_ids),
+                            "staff": sorted(
+                                staff,
+                                key=lambda item: (item["specialty"], item["therapist_id"]),
+                            ),
+                        },
+                    )
                 )
-            )
+            # (day, block, room) is unique per session, so the dicts are never compared.
+            decorated.sort()
+            schedule = [entry[4] for entry in decorated]
         elif status_code in (
             cp_model.INFEASIBLE,
             cp_model.UNKNOWN,
@@ -230,23 +485,35 @@ class SchedulerModel:
             diagnostics_by_method=diagnostics_by_method,
         )
 
-    def _get_session_var(self, therapy_id: str, room_id: str, day: str, block: int) -> cp_model.IntVar:
-        key = (therapy_id, room_id, day, block)
-        if key not in self.session_active:
-            self.session_active[key] = self.model.NewBoolVar(
-                f"s_{therapy_id}_{room_id}_{day}_{block}"
-            )
-        return self.session_active[key]
-
     def _build_variables(self) -> None:
         """Create assignment and session variables for feasible combinations."""
         (
             self.session_active,
             self.patient_sessions,
             self.staffing,
-        ) = build_base_variables(self.model, self.instance)
+        ) = build_base_variables(
+            self.model,
+            self.instance,
+            named=self.solver_options.log_search_progress,
+        )
+        base_proto = self.model.Proto()
+        self._base_proto_sizes = (len(base_proto.variables), len(base_proto.constraints))
+        self._index_variables()
         self._ensure_feasibility_of_requirements()
 
+    def _index_variables(self) -> None:
+        """Group session, patient and staffing variables by the keys the constraints query."""
+        for (pid, tid, rid, day, block), var in self.patient_sessions.items():
+            self._psess_by_session[(tid, rid, day, block)].append((pid, var))
+            self._sessions_by_patient_day[(pid, day)].append(var)
+            self._sessions_by_patient_slot[(pid, day, block)].append((tid, var))
+            self._sessions_by_patient_therapy[(pid, tid)].append((rid, day, block, var))
+        for (therapist_id, tid, rid, day, block, spec), var in self.staffing.items():
+            self._staff_by_session[(tid, rid, day, block)].append((therapist_id, spec, var))
+            self._staff_by_therapist_slot[(therapist_id, day, block)].append(var)
+        for (_tid, rid, day, block), var in self.session_active.items():
+            self._sessions_by_room_slot[(rid, day, block)].append(var)
+
     def _ensure_feasibility_of_requirements(self) -> None:
         # No early hard failure: let diagnostics report infeasibility details.
         return
@@ -262,13 +529,14 @@ class SchedulerModel:
         self._patient_continuous_hours_limit()
         self._therapist_and_room_single_session()
         if self.diagnostic_mode is None:
+            self._therapist_symmetry_breaking()
+            self._room_symmetry_breaking()
             self._build_therapist_busy_indicators()
             self._therapist_idle_gaps()
             self._patient_day_indicators()
 
     def _session_capacity_constraints(self) -> None:
         # Enforce session min/max patients, capped by room capacity.
-        rooms_by_id = {room.id: room for room in self.instance.rooms}
         for (
             therapy_id,
             room_id,
@@ -277,14 +545,13 @@ class SchedulerModel:
         ), session_var in self.session_active.items():
             session_assignments = [
                 var
-                for (pid, tid, rid, d, b), var in self.patient_sessions.items()
-                if tid == therapy_id and rid == room_id and d == day and b == block
+                for _pid, var in self._psess_by_session.get((therapy_id, room_id, day, block), ())
             ]
-            total_patients = sum(session_assignments)
             therapy_info: TherapyInfo = self.instance.therapies[therapy_id]
-            room: Room = rooms_by_id[room_id]
+            room: Room = self._rooms_by_id[room_id]
             max_allowed = min(therapy_info.max_patients, room.capacity)
             if self.diagnostic_mode == "soft":
+                total_patients = cp_model.LinearExpr.Sum(session_assignments)
                 slack_max = self.model.NewIntVar(
                     0,
                     max_allowed,
@@ -301,16 +568,21 @@ class SchedulerModel:
                 self.model.Add(total_patients + slack_min >= therapy_info.min_patients * session_var)
             else:
                 assumption = self._assumption_for(
-                    f"session_capacity|{therapy_id}"
-                )
-                constraint = self.model.Add(total_patients <= max_allowed)
-                if assumption is not None:
-                    constraint.OnlyEnforceIf(assumption)
-                constraint = self.model.Add(
-                    total_patients >= therapy_info.min_patients * session_var
+                    "session_capacity", therapy_id
                 )
-                if assumption is not None:
-                    constraint.OnlyEnforceIf(assumption)
+                # Rows that can never bind are skipped: the cap when there are no more
+                # candidates than seats, the quorum when the therapy has no minimum.
+                if len(session_assignments) > max_allowed:
+                    self._add_linear_row(session_assignments, 0, max_allowed, assumption)
+                if therapy_info.min_patients > 0:
+                    # sum(assignments) - min_patients * session_var >= 0
+                    self._add_linear_row(
+                        session_assignments + [session_var],
+                        0,
+                        len(session_assignments),
+                        assumption,
+                        coeffs=[1] * len(session_assignments) + [-therapy_info.min_patients],
+                    )
 
     def _staffing_requirements(self) -> None:
         # Enforce required number of therapists per specialty for each session.
@@ -324,19 +596,10 @@ class SchedulerModel:
             for specialty, required in therapy_info.requirements.items():
                 staff_vars = [
                     var
-                    for (
-                        _tid,
-                        tid,
-                        rid,
-                        d,
-                        b,
-                        spec,
-                    ), var in self.staffing.items()
-                    if tid == therapy_id
-                    and rid == room_id
-                    and d == day
-                    and b == block
-                    and spec == specialty
+                    for _therapist_id, spec, var in self._staff_by_session.get(
+                        (therapy_id, room_id, day, block), ()
+                    )
+                    if spec == specialty
                 ]
                 if self.diagnostic_mode == "soft":
                     slack = self.model.NewIntVar(
@@ -348,18 +611,25 @@ class SchedulerModel:
                         (therapy_id, room_id, day, block, specialty)
                     ] = slack
                     if staff_vars:
-                        self.model.Add(sum(staff_vars) + slack >= required * session_var)
+                        self.model.Add(
+                            cp_model.LinearExpr.Sum(staff_vars) + slack >= required * session_var
+                        )
                     else:
                         if required > 0:
                             self.model.Add(slack >= required * session_var)
                 else:
                     assumption = self._assumption_for(
-                        f"staffing|{therapy_id}|{specialty}"
+                        "staffing", therapy_id, specialty
                     )
                     if staff_vars:
-                        constraint = self.model.Add(sum(staff_vars) == required * session_var)
-                        if assumption is not None:
-                            constraint.OnlyEnforceIf(assumption)
+                        # sum(staff_vars) - required * session_var == 0
+                        self._add_linear_row(
+                            staff_vars + [session_var],
+                            0,
+                            0,
+                            assumption,
+                            coeffs=[1] * len(staff_vars) + [-required],
+                        )
                     else:
                         if required > 0:
                             constraint = self.model.Add(session_var == 0)
@@ -368,18 +638,17 @@ class SchedulerModel:
 
     def _patient_requirements(self) -> None:
         # Exactly meet the required count of sessions per patient and therapy.
+        # Unrequired therapies get no variables in build_base_variables, so their
+        # `sum([]) == 0` row would be trivially true and is not posted.
         for patient in self.instance.patients:
             for therapy_id, required in patient.therapies.items():
+                if required == 0:
+                    continue
                 vars_for_requirement = [
                     var
-                    for (
-                        pid,
-                        tid,
-                        _rid,
-                        _day,
-                        _block,
-                    ), var in self.patient_sessions.items()
-                    if pid == patient.id and tid == therapy_id
+                    for _rid, _day, _block, var in self._sessions_by_patient_therapy.get(
+                        (patient.id, therapy_id), ()
+                    )
                 ]
                 if required >= 0:
                     if self.diagnostic_mode == "soft":
@@ -389,14 +658,14 @@ class SchedulerModel:
                             f"slack_req_{patient.id}_{therapy_id}",
                         )
                         self.slack_patient_requirements[(patient.id, therapy_id)] = slack
-                        self.model.Add(sum(vars_for_requirement) + slack == required)
+                        self.model.Add(
+                            cp_model.LinearExpr.Sum(vars_for_requirement) + slack == required
+                        )
                     else:
                         assumption = self._assumption_for(
-                            f"patient_requirement|{patient.id}|{therapy_id}"
+                            "patient_requirement", patient.id, therapy_id
                         )
-                        constraint = self.model.Add(sum(vars_for_requirement) == required)
-                        if assumption is not None:
-                            constraint.OnlyEnforceIf(assumption)
+                        self._add_linear_row(vars_for_requirement, required, required, assumption)
 
     def _patient_pinned_sessions(self) -> None:
         # Ensure pinned therapy sessions are scheduled at the requested time.
@@ -407,24 +676,15 @@ class SchedulerModel:
                 for slot in slots:
                     vars_for_slot = [
                         var
-                        for (
-                            pid,
-                            tid,
-                            _rid,
-                            day,
-                            block,
-                        ), var in self.patient_sessions.items()
-                        if pid == patient.id
-                        and tid == therapy_id
-                        and day == slot.day
-                        and block == slot.block
+                        for tid, var in self._sessions_by_patient_slot.get(
+                            (patient.id, slot.day, slot.block), ()
+                        )
+                        if tid == therapy_id
                     ]
                     assumption = self._assumption_for(
-                        f"pinned_session|{patient.id}|{therapy_id}|{slot.day}|{slot.block}"
+                        "pinned_session", patient.id, therapy_id, slot.day, slot.block
                     )
-                    constraint = self.model.Add(sum(vars_for_slot) == 1)
-                    if assumption is not None:
-                        constraint.OnlyEnforceIf(assumption)
+                    self._add_linear_row(vars_for_slot, 1, 1, assumption)
 
     def _patient_fixed_therapists(self) -> None:
         # Ensure fixed therapists staff sessions a patient attends.
@@ -440,15 +700,9 @@ class SchedulerModel:
                     if not therapist_ids:
                         continue
                     for therapist_id in therapist_ids:
-                        for (
-                            pid,
-                            tid,
-                            rid,
-                            day,
-                            block,
-                        ), assign_var in self.patient_sessions.items():
-                            if pid != patient.id or tid != therapy_id:
-                                continue
+                        for rid, day, block, assign_var in self._sessions_by_patient_therapy.get(
+                            (patient.id, therapy_id), ()
+                        ):
                             staff_key = (
                                 therapist_id,
                                 therapy_id,
@@ -471,7 +725,7 @@ class SchedulerModel:
                                     self.model.Add(assign_var <= slack)
                                 continue
                             assumption = self._assumption_for(
-                                f"fixed_therapist|{patient.id}|{therapy_id}|{specialty}|{therapist_id}"
+                                "fixed_therapist", patient.id, therapy_id, specialty, therapist_id
                             )
                             if staff_var is not None:
                                 constraint = self.model.Add(assign_var <= staff_var)
@@ -487,14 +741,10 @@ class SchedulerModel:
                 for day in DAY_ORDER:
                     vars_for_day = [
                         var
-                        for (
-                            pid,
-                            tid,
-                            _rid,
-                            d,
-                            _block,
-                        ), var in self.patient_sessions.items()
-                        if pid == patient.id and d == day and tid == therapy_id
+                        for _rid, d, _block, var in self._sessions_by_patient_therapy.get(
+                            (patient.id, therapy_id), ()
+                        )
+                        if d == day
                     ]
                     if vars_for_day:
                         if self.diagnostic_mode == "soft":
@@ -504,14 +754,12 @@ class SchedulerModel:
                                 f"slack_nosameday_{patient.id}_{therapy_id}_{day}",
                             )
                             self.slack_no_same_day[(patient.id, therapy_id, day)] = slack
-                            self.model.Add(sum(vars_for_day) <= 1 + slack)
+                            self.model.Add(cp_model.LinearExpr.Sum(vars_for_day) <= 1 + slack)
                         else:
                             assumption = self._assumption_for(
-                                f"no_same_day|{patient.id}|{therapy_id}"
+                                "no_same_day", patient.id, therapy_id
                             )
-                            constraint = self.model.Add(sum(vars_for_day) <= 1)
-                            if assumption is not None:
-                                constraint.OnlyEnforceIf(assumption)
+                            self._add_at_most_one(vars_for_day, assumption)
 
     def _one_session_per_time(self) -> None:
         # Patients: at most one session per time slot.
@@ -520,186 +768,241 @@ class SchedulerModel:
                 for block in BLOCKS:
                     overlapping = [
                         var
-                        for (pid, _tid, _rid, d, b), var in self.patient_sessions.items()
-                        if pid == patient.id and d == day and b == block
+                        for _tid, var in self._sessions_by_patient_slot.get(
+                            (patient.id, day, block), ()
+                        )
                     ]
                     if overlapping:
                         assumption = self._assumption_for(
-                            f"patient_one_session|{patient.id}"
+                            "patient_one_session", patient.id
                         )
-                        constraint = self.model.Add(sum(overlapping) <= 1)
-                        if assumption is not None:
-                            constraint.OnlyEnforceIf(assumption)
+                        self._add_at_most_one(overlapping, assumption)
 
     def _patient_continuous_hours_limit(self) -> None:
         # Sliding window: prevent more than max_continuous_hours consecutive blocks per day.
-        segments = consecutive_segments()
+        # Each block holds at most one session (_one_session_per_time), so a window whose
+        # candidate blocks number no more than the limit can never bind and is skipped.
         for patient in self.instance.patients:
             limit = patient.max_continuous_hours
             for day in DAY_ORDER:
-                for segment in segments:
-                    if len(segment) < 4:
+                if (patient.id, day) not in self._sessions_by_patient_day:
+                    continue
+                # Resolve each block once; overlapping windows share the lookups.
+                slots_by_block = {
+                    block: self._sessions_by_patient_slot.get((patient.id, day, block), ())
+                    for block in BLOCKS
+                }
+                for window in _WINDOWS_OF_4:
+                    window_slots = [slots_by_block[b] for b in window]
+                    if sum(1 for slot_vars in window_slots if slot_vars) <= limit:
                         continue
-                    for idx in range(len(segment) - 3):
-                        window_blocks = segment[idx : idx + 4]
-                        window_vars = [
-                            var
-                            for (
-                                pid,
-                                _tid,
-                                _rid,
-                                d,
-                                b,
-                            ), var in self.patient_sessions.items()
-                            if pid == patient.id and d == day and b in window_blocks
-                        ]
-                        if window_vars:
-                            assumption = self._assumption_for(
-                                f"patient_continuous|{patient.id}"
-                            )
-                            constraint = self.model.Add(sum(window_vars) <= limit)
-                            if assumption is not None:
-                                constraint.OnlyEnforceIf(assumption)
+                    window_vars = [
+                        var for slot_vars in window_slots for _tid, var in slot_vars
+                    ]
+                    if window_vars:
+                        assumption = self._assumption_for(
+                            "patient_continuous", patient.id
+                        )
+                        self._add_linear_row(window_vars, 0, limit, assumption)
 
     def _therapist_and_room_single_session(self) -> None:
         # Only one session per therapist per block.
         for therapist in self.instance.therapists:
             for day in DAY_ORDER:
                 for block in BLOCKS:
-                    sessions = [
-                        session_var
-                        for (
-                            tid,
-                            _therapy_id,
-                            _rid,
-                            d,
-                            b,
-                            _spec,
-                        ), session_var in self.staffing.items()
-                        if tid == therapist.id and d == day and b == block
-                    ]
+                    sessions = self._staff_by_therapist_slot.get((therapist.id, day, block), ())
                     if sessions:
                         assumption = self._assumption_for(
-                            f"therapist_one_session|{therapist.id}"
+                            "therapist_one_session", therapist.id
                         )
-                        constraint = self.model.Add(sum(sessions) <= 1)
-                        if assumption is not None:
-                            constraint.OnlyEnforceIf(assumption)
+                        self._add_at_most_one(sessions, assumption)
 
         # Only one session per room per block.
         for room in self.instance.rooms:
             for day in DAY_ORDER:
                 for block in BLOCKS:
-                    sessions = [
-                        session_var
-                        for (
-                            _therapy_id,
-                            rid,
-                            d,
-                            b,
-                        ), session_var in self.session_active.items()
-                        if rid == room.id and d == day and b == block
-                    ]
+                    sessions = self._sessions_by_room_slot.get((room.id, day, block), ())
                     if sessions:
-                        assumption = self._assumption_for(f"room_one_session|{room.id}")
-                        constraint = self.model.Add(sum(sessions) <= 1)
-                        if assumption is not None:
-                            constraint.OnlyEnforceIf(assumption)
+                        assumption = self._assumption_for("room_one_session", room.id)
+                        self._add_at_most_one(sessions, assumption)
+
+    def _therapist_symmetry_groups(self) -> List[List[str]]:
+        # Therapists with identical specialties and availability that no patient fixes are
+        # interchangeable. Returns each group of two or more, sorted by id.
+        fixed_ids: Set[str] = set()
+        for patient in self.instance.patients:
+            for fixed in patient.fixed_therapists.values():
+                for therapist_ids in fixed.values():
+                    if isinstance(therapist_ids, list):
+                        fixed_ids.update(therapist_ids)
+                    else:
+                        fixed_ids.add(therapist_ids)
+        groups: DefaultDict[Tuple[object, ...], List[str]] = defaultdict(list)
+        for therapist in self.instance.therapists:
+            if therapist.id in fixed_ids:
+                continue
+            signature = (
+                frozenset(therapist.specialties),
+                tuple(
+                    (day, therapist.availability[day])
+                    for day in DAY_ORDER
+                    if therapist.availability.get(day)
+                ),
+            )
+            groups[signature].append(therapist.id)
+        return [sorted(ids) for ids in groups.values() if len(ids) > 1]
+
+    def _room_symmetry_groups(self) -> List[List[str]]:
+        # Rooms hosting the same therapies with the same capacity are interchangeable.
+        groups: DefaultDict[Tuple[object, ...], List[str]] = defaultdict(list)
+        for room in self.instance.rooms:
+            groups[(frozenset(room.therapies), room.capacity)].append(room.id)
+        return [sorted(ids) for ids in groups.values() if len(ids) > 1]
+
+    def _therapist_symmetry_breaking(self) -> None:
+        # Order interchangeable therapists' workloads so only one permutation gets explored.
+        # Nothing ties a therapist across days (idle gaps and busy blocks are per day), so
+        # whole days can be swapped within a group: order the workloads day by day.
+        staff_by_slot = self._staff_by_therapist_slot
+
+        def workload(therapist_id: str, day: str) -> List[cp_model.IntVar]:
+            return [
+                var
+                for block in BLOCKS
+                for var in staff_by_slot.get((therapist_id, day, block), ())
+            ]
+
+        for ordered in self._therapist_symmetry_groups():
+            for day in DAY_ORDER:
+                workloads = [workload(tid, day) for tid in ordered]
+                for first, second in zip(workloads, workloads[1:]):
+                    if second:
+                        self.model.Add(
+                            cp_model.LinearExpr.Sum(first) >= cp_model.LinearExpr.Sum(second)
+                        )
+
+    def _room_symmetry_breaking(self) -> None:
+        # Nothing ties a room across blocks, so order interchangeable rooms' occupancy
+        # slot by slot.
+        for ordered in self._room_symmetry_groups():
+            for first, second in zip(ordered, ordered[1:]):
+                for day in DAY_ORDER:
+                    for block in BLOCKS:
+                        second_sessions = self._sessions_by_room_slot.get(
+                            (second, day, block), ()
+                        )
+                        if not second_sessions:
+                            continue
+                        self.model.Add(
+                            cp_model.LinearExpr.Sum(
+                                self._sessions_by_room_slot.get((first, day, block), ())
+                            )
+                            >= cp_model.LinearExpr.Sum(second_sessions)
+                        )
 
     def _build_therapist_busy_indicators(self) -> None:
         # Derive per-block busy indicators so we can reason about gaps/contiguity.
+        # Only built in the hard model, where _therapist_and_room_single_session already
+        # posts AddAtMostOne over the same literals: busy is then just their sum, and a
+        # slot with a single candidate reuses that literal directly.
         for therapist in self.instance.therapists:
             for day in DAY_ORDER:
                 for block in BLOCKS:
-                    sessions = [
-                        session_var
-                        for (
-                            tid,
-                            _therapy_id,
-                            _rid,
-                            d,
-                            b,
-                            _spec,
-                        ), session_var in self.staffing.items()
-                        if tid == therapist.id and d == day and b == block
-                    ]
+                    sessions = self._staff_by_therapist_slot.get((therapist.id, day, block), ())
                     if not sessions:
                         continue
+                    if len(sessions) == 1:
+                        self.therapist_busy[(therapist.id, day, block)] = sessions[0]
+                        continue
                     indicator = self.model.NewBoolVar(
                         f"busy_{therapist.id}_{day}_{block}"
+                        if self.solver_options.log_search_progress
+                        else ""
                     )
                     self.therapist_busy[(therapist.id, day, block)] = indicator
-                    self.model.Add(sum(sessions) >= indicator)
-                    self.model.Add(sum(sessions) <= len(sessions) * indicator)
+                    self._add_linear_row(
+                        list(sessions) + [indicator], 0, 0, coeffs=[1] * len(sessions) + [-1]
+                    )
 
     def _therapist_idle_gaps(self) -> None:
         # Identify idle gaps shaped like busy - idle - busy within a contiguous segment.
-        segments = consecutive_segments()
         for therapist in self.instance.therapists:
             for day in DAY_ORDER:
-                for segment in segments:
-                    for idx in range(1, len(segment) - 1):
-                        block = segment[idx]
-                        prev_block = segment[idx - 1]
-                        next_block = segment[idx + 1]
-                        busy_prev = self.therapist_busy.get(
-                            (therapist.id, day, prev_block)
-                        )
-                        busy_curr = self.therapist_busy.get((therapist.id, day, block))
-                        busy_next = self.therapist_busy.get(
-                            (therapist.id, day, next_block)
+                for prev_block, block, next_block in _IDLE_TRIPLES:
+                    busy_prev = self.therapist_busy.get(
+                        (therapist.id, day, prev_block)
+                    )
+                    busy_curr = self.therapist_busy.get((therapist.id, day, block))
+                    busy_next = self.therapist_busy.get(
+                        (therapist.id, day, next_block)
+                    )
+                    if (
+                        busy_prev is not None
+                        and busy_curr is not None
+                        and busy_next is not None
+                    ):
+                        gap = self.model.NewBoolVar(
+                            f"idle_{therapist.id}_{day}_{block}"
+                            if self.solver_options.log_search_progress
+                            else ""
                         )
-                        if (
-                            busy_prev is not None
-                            and busy_curr is not None
-                            and busy_next is not None
-                        ):
-                            gap = self.model.NewBoolVar(
-                                f"idle_{therapist.id}_{day}_{block}"
-                            )
-                            self.idle_gaps.append(gap)
-                            self.model.Add(gap <= busy_prev)
-                            self.model.Add(gap <= busy_next)
-                            self.model.Add(gap <= 1 - busy_curr)
+                        self.idle_gaps.append(gap)
+                        self.model.AddImplication(gap, busy_prev)
+                        self.model.AddImplication(gap, busy_next)
+                        self.model.AddImplication(gap, busy_curr.Not())
 
     def _patient_day_indicators(self) -> None:
         # Track whether a patient uses a given day (for objective minimization).
         for patient in self.instance.patients:
-            for day in DAY_ORDER:
-                vars_for_day = [
-                    var
-                    for (pid, _tid, _rid, d, _b), var in self.patient_sessions.items()
-                    if pid == patient.id and d == day
-                ]
+            # Only days with availability or a pinned session can hold assignments.
+            pinned_days = {
+                slot.day for slots in patient.pinned_sessions.values() for slot in slots
+            }
+            active_days = [
+                day
+                for day in DAY_ORDER
+                if patient.availability.get(day) or day in pinned_days
+            ]
+            for day in active_days:
+                vars_for_day = self._sessions_by_patient_day.get((patient.id, day), ())
                 if not vars_for_day:
                     continue
-                indicator = self.model.NewBoolVar(f"day_used_{patient.id}_{day}")
+                if len(vars_for_day) == 1:
+                    # A single candidate session is its own day indicator.
+                    self.patient_day_used[(patient.id, day)] = vars_for_day[0]
+                    continue
+                indicator = self.model.NewBoolVar(
+                    f"day_used_{patient.id}_{day}"
+                    if self.solver_options.log_search_progress
+                    else ""
+                )
                 self.patient_day_used[(patient.id, day)] = indicator
-                self.model.Add(sum(vars_for_day) >= indicator)
-                self.model.Add(sum(vars_for_day) <= len(vars_for_day) * indicator)
+                # indicator == OR(vars_for_day); all vars are Booleans, so max is the OR.
+                self.model.AddMaxEquality(indicator, vars_for_day)
 
     def _add_objective(self) -> None:
         if self.diagnostic_mode == "soft":
             self._add_soft_objective()
             return
         if self.diagnostic_mode == "assumptions":
-            self.model.Minimize(0)
+            # Pure feasibility: without an objective CP-SAT stops at the first solution.
             return
         # Minimize patient travel (days used) and therapist idle single-block gaps.
-        terms = []
+        variables: List[cp_model.IntVar] = []
+        coefficients: List[int] = []
         if self.objective_weights.patient_days_weight:
-            terms.append(
-                self.objective_weights.patient_days_weight
-                * sum(self.patient_day_used.values())
+            variables.extend(self.patient_day_used.values())
+            coefficients.extend(
+                [self.objective_weights.patient_days_weight] * len(self.patient_day_used)
             )
         if self.objective_weights.therapist_idle_gap_weight:
-            terms.append(
-                self.objective_weights.therapist_idle_gap_weight * sum(self.idle_gaps)
+            variables.extend(self.idle_gaps)
+            coefficients.extend(
+                [self.objective_weights.therapist_idle_gap_weight] * len(self.idle_gaps)
             )
-        if terms:
-            self.model.Minimize(sum(terms))
-        else:
-            self.model.Minimize(0)
+        # With every weight at zero the model stays a pure feasibility problem.
+        if variables:
+            self.model.Minimize(cp_model.LinearExpr.WeightedSum(variables, coefficients))
 
     def _add_soft_objective(self) -> None:
         terms: List[cp_model.IntVar] = []
@@ -711,65 +1014,330 @@ class SchedulerModel:
         for items in self.slack_fixed_therapist.values():
             terms.extend(items)
         if terms:
-            self.model.Minimize(sum(terms))
+            self.model.Minimize(cp_model.LinearExpr.Sum(terms))
+
+    def _add_greedy_hints(self) -> None:
+        # Warm start: give each patient their earliest feasible slots (pinned ones first),
+        # joining a compatible open session before opening a new one. Sessions that reach
+        # their quorum are hinted as-is; CP-SAT completes or repairs the partial hint,
+        # including any clash with the symmetry-breaking rows.
+        patient_busy: Set[Tuple[str, str, int]] = set()
+        therapist_busy: Set[Tuple[str, str, int]] = set()
+        room_busy: Set[Tuple[str, str, int]] = set()
+        # session -> ([(therapist, specialty)], [patient])
+        opened: Dict[SessionKey, Tuple[List[Tuple[str, str]], List[str]]] = {}
+
+        def pick_staff(
+            key: SessionKey, fixed: Set[Tuple[str, str]]
+        ) -> Optional[List[Tuple[str, str]]]:
+            therapy_id, _room_id, day, block = key
+            candidates = sorted(
+                (
+                    (therapist_id, spec)
+                    for therapist_id, spec, _var in self._staff_by_session.get(key, ())
+                ),
+                key=lambda role: (role not in fixed, role[0]),
+            )
+            staff: List[Tuple[str, str]] = []
+            chosen: Set[str] = set()
+            for specialty, required in self.instance.therapies[therapy_id].requirements.items():
+                pool = [
+                    (therapist_id, spec)
+                    for therapist_id, spec in candidates
+                    if spec == specialty
+                    and therapist_id not in chosen
+                    and (therapist_id, day, block) not in therapist_busy
+                ][:required]
+                if len(pool) < required:
+                    return None
+                staff.extend(pool)
+                chosen.update(therapist_id for therapist_id, _spec in pool)
+            return staff if fixed <= set(staff) else None
+
+        for patient in self.instance.patients:
+            limit = patient.max_continuous_hours
+            days_with_therapy: Set[Tuple[str, str]] = set()
+            for therapy_id, required in patient.therapies.items():
+                if required <= 0:
+                    continue
+                fixed = {
+                    (therapist_id, specialty)
+                    for specialty, ids in patient.fixed_therapists.get(therapy_id, {}).items()
+                    for therapist_id in (ids if isinstance(ids, list) else [ids])
+                    if therapist_id
+                }
+                pinned = {
+                    (slot.day, slot.block)
+                    for slot in patient.pinned_sessions.get(therapy_id, ())
+                }
+                therapy_info = self.instance.therapies[therapy_id]
+                placed = 0
+                for room_id, day, block, _var in sorted(
+                    self._sessions_by_patient_therapy.get((patient.id, therapy_id), ()),
+                    key=lambda slot: (
+                        (slot[1], slot[2]) not in pinned,
+                        _DAY_INDEX[slot[1]],
+                        slot[2],
+                        slot[0],
+                    ),
+                ):
+                    if placed == required:
+                        break
+                    if (patient.id, day, block) in patient_busy:
+                        continue
+                    if (
+                        therapy_id in patient.no_same_day_therapies
+                        and (therapy_id, day) in days_with_therapy
+                    ):
+                        continue
+                    if any(
+                        block in window
+                        and sum((patient.id, day, b) in patient_busy for b in window) >= limit
+                        for window in _WINDOWS_OF_4
+                    ):
+                        continue
+                    key = (therapy_id, room_id, day, block)
+                    if key in opened:
+                        staff, attendees = opened[key]
+                        max_allowed = min(
+                            therapy_info.max_patients, self._rooms_by_id[room_id].capacity
+                        )
+                        if len(attendees) >= max_allowed or not fixed <= set(staff):
+                            continue
+                    else:
+                        if (room_id, day, block) in room_busy:
+                            continue
+                        new_staff = pick_staff(key, fixed)
+                        if new_staff is None:
+                            continue
+                        staff, attendees = new_staff, []
+                        opened[key] = (staff, attendees)
+                        room_busy.add((room_id, day, block))
+                        therapist_busy.update(
+                            (therapist_id, day, block) for therapist_id, _spec in staff
+                        )
+                    attendees.append(patient.id)
+                    patient_busy.add((patient.id, day, block))
+                    days_with_therapy.add((therapy_id, day))
+                    placed += 1
+
+        kept = {
+            key: session
+            for key, session in opened.items()
+            if len(session[1]) >= self.instance.therapies[key[0]].min_patients
+        }
+
+        for (therapy_id, room_id, day, block), (staff, attendees) in kept.items():
+            self.model.AddHint(self.session_active[(therapy_id, room_id, day, block)], 1)
+            for patient_id in attendees:
+                self.model.AddHint(
+                    self.patient_sessions[(patient_id, therapy_id, room_id, day, block)], 1
+                )
+            for therapist_id, specialty in staff:
+                self.model.AddHint(
+                    self.staffing[(therapist_id, therapy_id, room_id, day, block, specialty)], 1
+                )
+
+    def _add_at_most_one(
+        self, literals: Sequence[cp_model.IntVar], assumption: Optional[cp_model.IntVar]
+    ) -> None:
+        # AtMostOne has no enforcement literals, so assumption-guarded rows stay linear.
+        if assumption is None:
+            self.model.AddAtMostOne(literals)
         else:
-            self.model.Minimize(0)
+            self._add_linear_row(literals, 0, 1, assumption)
 
-    def _assumption_for(self, label: str) -> Optional[cp_model.IntVar]:
+    def _add_linear_row(
+        self,
+        variables: Sequence[cp_model.IntVar],
+        lower: int,
+        upper: int,
+        assumption: Optional[cp_model.IntVar] = None,
+        coeffs: Optional[Sequence[int]] = None,
+    ) -> None:
+        # Post `lower <= sum(coeffs * variables) <= upper` straight into the proto. For the
+        # thousands of small unit sums in this model, building a LinearExpr and letting
+        # Add() flatten it again costs more than the row itself. Variables must be distinct.
+        constraint = cp_model.Constraint(self.model)
+        linear = constraint.Proto().linear
+        linear.vars.extend([var.Index() for var in variables])
+        linear.coeffs.extend(coeffs if coeffs is not None else [1] * len(variables))
+        linear.domain.extend([lower, upper])
+        if assumption is not None:
+            constraint.OnlyEnforceIf(assumption)
+
+    def _assumption_for(self, *label: object) -> Optional[cp_model.IntVar]:
+        # Labels are plain tuples; they only become a variable name when logging is on.
         if self.diagnostic_mode != "assumptions":
             return None
-        if label not in self.assumptions:
-            safe_label = "".join(ch if ch.isalnum() or ch == "_" else "_" for ch in label)
-            var = self.model.NewBoolVar(f"assump_{safe_label}")
+        var = self.assumptions.get(label)
+        if var is None:
+            var_name = ""
+            if self.solver_options.log_search_progress:
+                raw_name = "_".join(str(part) for part in label)
+                safe_label = "".join(ch if ch.isalnum() or ch == "_" else "_" for ch in raw_name)
+                var_name = f"assump_{safe_label}"
+            var = self.model.NewBoolVar(var_name)
             self.assumptions[label] = var
             self.assumption_index_to_label[var.Index()] = label
-        return self.assumptions[label]
+        return var
 
     def _run_diagnostics(self) -> Dict[str, List[str]]:
-        diagnostics: Dict[str, List[str]] = {}
-        diagnostics["assumptions"] = self._diagnose_with_assumptions()
-        diagnostics["prechecks"] = self._diagnose_infeasibility()
-        diagnostics["soft"] = self._diagnose_with_soft_constraints()
-        return diagnostics
+        cache_path = self._diagnostics_cache_path()
+        cached = self._load_cached_diagnostics(cache_path)
+        runners = {
+            "assumptions": self._diagnose_with_assumptions,
+            "soft": self._diagnose_with_soft_constraints,
+        }
+        pending = [method for method in _CACHED_DIAGNOSTICS if method not in cached]
+        if pending:
+            self._build_diagnostic_skeleton()
+        # All three diagnostics run side by side. Threads rather than processes: CP-SAT
+        # releases the GIL while solving, and the diagnostic models share the skeleton
+        # CpModel, which cannot be pickled across process boundaries.
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {method: executor.submit(runners[method]) for method in pending}
+            prechecks_future = executor.submit(self._diagnose_infeasibility)
+            outcomes = {method: future.result() for method, future in futures.items()}
+            prechecks = prechecks_future.result()
+        solved = {method: messages for method, (messages, _) in outcomes.items()}
+        definitive = {
+            method: messages
+            for method, (messages, status_code) in outcomes.items()
+            if status_code == _DEFINITIVE_STATUS[method]
+        }
+        if definitive:
+            self._store_cached_diagnostics(cache_path, {**cached, **definitive})
+        results = {**cached, **solved}
+        return {
+            "assumptions": results["assumptions"],
+            "prechecks": prechecks,
+            "soft": results["soft"],
+        }
 
-    def _flatten_diagnostics(self, diagnostics: Dict[str, List[str]]) -> List[str]:
-        flattened: List[str] = []
-        for key in ("assumptions", "prechecks", "soft"):
-            for item in diagnostics.get(key, []):
-                flattened.append(f"{key}: {item}")
-        return flattened
+    def _instance_fingerprint(self) -> str:
+        """Stable digest of the instance, time limit and OR-Tools version behind the diagnostics."""
+        payload = {
+            "version": _DIAGNOSTICS_CACHE_VERSION,
+            "ortools": ortools.__version__,
+            "instance": asdict(self.instance),
+            "time_limit": self.solver_options.time_limit,
+        }
+        canonical = json.dumps(payload, sort_keys=True, default=_json_default)
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=20).hexdigest()
 
-    def _diagnose_with_assumptions(self) -> List[str]:
+    def _diagnostics_cache_path(self) -> Optional[Path]:
+        cache_dir = self.solver_options.diagnostics_cache_dir
+        if not cache_dir:
+            return None
+        return Path(cache_dir) / f"{self._instance_fingerprint()}.json"
+
+    def _load_cached_diagnostics(self, path: Optional[Path]) -> Dict[str, List[str]]:
+        # The cache is best effort: unreadable or malformed entries count as misses.
+        if path is None:
+            return {}
+        try:
+            payload = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(payload, dict):
+            return {}
+        return {
+            method: [str(item) for item in payload[method]]
+            for method in _CACHED_DIAGNOSTICS
+            if isinstance(payload.get(method), list)
+        }
+
+    def _store_cached_diagnostics(
+        self, path: Optional[Path], diagnostics: Dict[str, List[str]]
+    ) -> None:
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(diagnostics))
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+
+    def _build_diagnostic_skeleton(self) -> Tuple[cp_model.CpModel, BaseVariables]:
+        """Build the base variables shared by every diagnostic model once."""
+        if self._diagnostic_skeleton is None:
+            skeleton = cp_model.CpModel()
+            if self._base_proto_sizes is None:
+                base_variables = build_base_variables(
+                    skeleton,
+                    self.instance,
+                    named=self.solver_options.log_search_progress,
+                )
+            else:
+                # The main model is already built: copy its base prefix instead of
+                # rebuilding it. Variable indices match, so the same dicts apply.
+                num_variables, num_constraints = self._base_proto_sizes
+                source = self.model.Proto()
+                skeleton.Proto().variables.extend(source.variables[:num_variables])
+                skeleton.Proto().constraints.extend(source.constraints[:num_constraints])
+                base_variables = (self.session_active, self.patient_sessions, self.staffing)
+            self._diagnostic_skeleton = (skeleton, base_variables)
+        return self._diagnostic_skeleton
+
+    def _diagnostic_model(self, mode: str) -> SchedulerModel:
+        """Clone the diagnostic skeleton and add the constraints for `mode`."""
+        skeleton, (session_active, patient_sessions, staffing) = self._build_diagnostic_skeleton()
         diagnostic = SchedulerModel(
             instance=self.instance,
             objective_weights=ObjectiveWeights(0, 0),
             solver_options=self.solver_options,
         )
-        diagnostic.diagnostic_mode = "assumptions"
-        diagnostic._build_variables()
+        diagnostic.diagnostic_mode = mode
+        diagnostic.model = skeleton.Clone()
+        rebind = diagnostic.model.GetBoolVarFromProtoIndex
+        diagnostic.session_active = {
+            key: rebind(var.Index()) for key, var in session_active.items()
+        }
+        diagnostic.patient_sessions = {
+            key: rebind(var.Index()) for key, var in patient_sessions.items()
+        }
+        diagnostic.staffing = {key: rebind(var.Index()) for key, var in staffing.items()}
+        diagnostic._index_variables()
+        diagnostic._ensure_feasibility_of_requirements()
         diagnostic._add_constraints()
         diagnostic._add_objective()
+        return diagnostic
+
+    def _flatten_diagnostics(self, diagnostics: Dict[str, List[str]]) -> List[str]:
+        flattened: List[str] = []
+        for key in ("assumptions", "prechecks", "soft"):
+            for item in diagnostics.get(key, []):
+                flattened.append(f"{key}: {item}")
+        return flattened
+
+    def _diagnose_with_assumptions(self) -> Tuple[List[str], Optional[int]]:
+        # Returns the messages and the solve status (None when no solve ran).
+        diagnostic = self._diagnostic_model("assumptions")
 
         if not diagnostic.assumptions:
-            return ["No assumptions registered for diagnostics."]
+            return ["No assumptions registered for diagnostics."], None
 
-        add_assumptions = getattr(diagnostic.model, "add_assumptions", None) or getattr(
-            diagnostic.model, "AddAssumptions", None
-        )
-        if not add_assumptions:
-            return ["Assumption diagnostics not supported by this OR-Tools version."]
-        add_assumptions(list(diagnostic.assumptions.values()))
+        if _ADD_ASSUMPTIONS_NAME is None:
+            return ["Assumption diagnostics not supported by this OR-Tools version."], None
+        getattr(diagnostic.model, _ADD_ASSUMPTIONS_NAME)(list(diagnostic.assumptions.values()))
         solver = cp_model.CpSolver()
         solver.parameters.max_time_in_seconds = self.solver_options.time_limit
         solver.parameters.num_search_workers = 1
+        # Pure feasibility with assumptions: skip the LP relaxation, keep probing light.
+        solver.parameters.optimize_with_core = True
+        solver.parameters.linearization_level = 0
+        solver.parameters.cp_model_probing_level = 1
         status_code = solver.Solve(diagnostic.model)
         if status_code != cp_model.INFEASIBLE:
-            return [f"Assumption model status: {self._status_name(status_code)}."]
-        if not hasattr(solver, "sufficient_assumptions_for_infeasibility"):
-            return ["Assumption core extraction not supported by this OR-Tools version."]
-        core = solver.sufficient_assumptions_for_infeasibility()
+            return [f"Assumption model status: {self._status_name(status_code)}."], status_code
+        if _ASSUMPTION_CORE_NAME is None:
+            return ["Assumption core extraction not supported by this OR-Tools version."], status_code
+        core = getattr(solver, _ASSUMPTION_CORE_NAME)()
         if not core:
-            return ["Assumption core empty: infeasibility comes from unconditional constraints."]
+            return ["Assumption core empty: infeasibility comes from unconditional constraints."], status_code
         demand_sessions_by_therapy: Dict[str, int] = {}
         for patient in diagnostic.instance.patients:
             for therapy_id, required in patient.therapies.items():
@@ -792,126 +1360,116 @@ class SchedulerModel:
                 continue
             else:
                 messages.append(diagnostic._format_assumption_label(label))
-        return messages
+        return messages, status_code
 
-    def _label_for_literal(self, literal: int) -> Optional[str]:
+    def _label_for_literal(self, literal: int) -> Optional[AssumptionLabel]:
         index = literal
         if literal < 0:
             index = -literal - 1
         return self.assumption_index_to_label.get(index)
 
-    def _format_assumption_label(self, label: str) -> str:
-        parts = label.split("|")
-        kind = parts[0] if parts else label
-        if kind == "patient_requirement" and len(parts) >= 3:
-            return f"Patient {parts[1]} required sessions for therapy '{parts[2]}'."
-        if kind == "no_same_day" and len(parts) >= 3:
-            return f"Patient {parts[1]} no_same_day for therapy '{parts[2]}'."
-        if kind == "staffing" and len(parts) >= 3:
-            return f"Staffing requirement for therapy '{parts[1]}' specialty '{parts[2]}'."
-        if kind == "session_capacity" and len(parts) >= 2:
-            return f"Session capacity/min patients for therapy '{parts[1]}'."
-        if kind == "patient_one_session" and len(parts) >= 2:
-            return f"Patient {parts[1]} one-session-per-time constraint."
-        if kind == "patient_continuous" and len(parts) >= 2:
-            return f"Patient {parts[1]} continuous hours limit."
-        if kind == "therapist_one_session" and len(parts) >= 2:
-            return f"Therapist {parts[1]} one-session-per-time constraint."
-        if kind == "room_one_session" and len(parts) >= 2:
-            return f"Room {parts[1]} one-session-per-time constraint."
-        if kind == "fixed_therapist" and len(parts) >= 5:
+    def _format_assumption_label(self, label: AssumptionLabel) -> str:
+        kind = label[0] if label else ""
+        if kind == "patient_requirement" and len(label) >= 3:
+            return f"Patient {label[1]} required sessions for therapy '{label[2]}'."
+        if kind == "no_same_day" and len(label) >= 3:
+            return f"Patient {label[1]} no_same_day for therapy '{label[2]}'."
+        if kind == "staffing" and len(label) >= 3:
+            return f"Staffing requirement for therapy '{label[1]}' specialty '{label[2]}'."
+        if kind == "session_capacity" and len(label) >= 2:
+            return f"Session capacity/min patients for therapy '{label[1]}'."
+        if kind == "patient_one_session" and len(label) >= 2:
+            return f"Patient {label[1]} one-session-per-time constraint."
+        if kind == "patient_continuous" and len(label) >= 2:
+            return f"Patient {label[1]} continuous hours limit."
+        if kind == "therapist_one_session" and len(label) >= 2:
+            return f"Therapist {label[1]} one-session-per-time constraint."
+        if kind == "room_one_session" and len(label) >= 2:
+            return f"Room {label[1]} one-session-per-time constraint."
+        if kind == "fixed_therapist" and len(label) >= 5:
             return (
-                f"Patient {parts[1]} fixed therapist {parts[4]} "
-                f"for therapy '{parts[2]}' specialty '{parts[3]}'."
+                f"Patient {label[1]} fixed therapist {label[4]} "
+                f"for therapy '{label[2]}' specialty '{label[3]}'."
             )
-        if kind == "pinned_session" and len(parts) >= 5:
-            time_range = parts[4]
-            try:
-                time_range = block_to_range(int(parts[4]))
-            except (ValueError, TypeError):
-                pass
+        if kind == "pinned_session" and len(label) >= 5:
+            block = label[4]
+            time_range = block_to_range(block) if isinstance(block, int) else str(block)
             return (
-                f"Patient {parts[1]} pinned therapy '{parts[2]}' "
-                f"on {parts[3]} {time_range}."
+                f"Patient {label[1]} pinned therapy '{label[2]}' "
+                f"on {label[3]} {time_range}."
             )
-        return label
-
-    def _skip_assumption_label(self, label: str, skip_therapies: Set[str]) -> bool:
-        parts = label.split("|")
-        if not parts:
-            return False
-        kind = parts[0]
-        if kind in ("session_capacity", "staffing") and len(parts) >= 2:
-            return parts[1] in skip_therapies
+        return "|".join(str(part) for part in label)
+
+    def _skip_assumption_label(self, label: AssumptionLabel, skip_therapies: Set[str]) -> bool:
+        if len(label) >= 2 and label[0] in ("session_capacity", "staffing"):
+            return label[1] in skip_therapies
         return False
 
-    def _diagnose_with_soft_constraints(self) -> List[str]:
-        diagnostic = SchedulerModel(
-            instance=self.instance,
-            objective_weights=ObjectiveWeights(0, 0),
-            solver_options=self.solver_options,
-        )
-        diagnostic.diagnostic_mode = "soft"
-        diagnostic._build_variables()
-        diagnostic._add_constraints()
-        diagnostic._add_objective()
+    def _diagnose_with_soft_constraints(self) -> Tuple[List[str], Optional[int]]:
+        # Returns the messages and the solve status.
+        diagnostic = self._diagnostic_model("soft")
 
         solver = cp_model.CpSolver()
         solver.parameters.max_time_in_seconds = self.solver_options.time_limit
+        # Use the full portfolio, but never more workers than cores (oversubscribing slows it down).
+        solver.parameters.num_search_workers = os.cpu_count() or 1
         status_code = solver.Solve(diagnostic.model)
         if status_code not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            return [f"Soft diagnostic model status: {self._status_name(status_code)}."]
-        return diagnostic._soft_diagnostics_from_solver(solver)
-
-    def _soft_diagnostics_from_solver(self, solver: cp_model.CpSolver) -> List[str]:
-        messages: List[str] = []
-        for (patient_id, therapy_id), slack in self.slack_patient_requirements.items():
-            value = solver.Value(slack)
-            if value > 0:
-                messages.append(
-                    f"Patient {patient_id} missing {value} session(s) of therapy '{therapy_id}'."
-                )
-        for (patient_id, therapy_id, day), slack in self.slack_no_same_day.items():
-            value = solver.Value(slack)
-            if value > 0:
-                messages.append(
-                    f"Patient {patient_id} needs {value} extra '{therapy_id}' session(s) on {day} (no_same_day)."
-                )
-        for (therapy_id, room_id, day, block), slack in self.slack_session_min.items():
-            value = solver.Value(slack)
-            if value > 0:
-                messages.append(
-                    f"Session {therapy_id} in room {room_id} {day} {block_to_range(block)} "
-                    f"short {value} patient(s) vs minimum."
-                )
-        for (therapy_id, room_id, day, block), slack in self.slack_session_max.items():
-            value = solver.Value(slack)
-            if value > 0:
-                messages.append(
-                    f"Session {therapy_id} in room {room_id} {day} {block_to_range(block)} "
-                    f"over capacity by {value} patient(s)."
-                )
-        for (therapy_id, room_id, day, block, specialty), slack in self.slack_staffing.items():
-            value = solver.Value(slack)
-            if value > 0:
-                messages.append(
-                    f"Need +{value} '{specialty}' staff for therapy {therapy_id} "
-                    f"in room {room_id} {day} {block_to_range(block)}."
-                )
-        for (patient_id, therapy_id, specialty, therapist_id), slacks in self.slack_fixed_therapist.items():
-            total = sum(solver.Value(slack) for slack in slacks)
-            if total > 0:
-                messages.append(
-                    f"Patient {patient_id} needs therapist {therapist_id} for '{therapy_id}' "
-                    f"({specialty}), but {total} session(s) violate that requirement."
-                )
-        return self._limit_messages(messages)
-
-    def _limit_messages(self, messages: Iterable[str], limit: int = 20) -> List[str]:
-        items = list(messages)
-        if len(items) <= limit:
+            status_name = self._status_name(status_code)
+            return [f"Soft diagnostic model status: {status_name}."], status_code
+        return diagnostic._soft_diagnostics_from_solver(solver), status_code
+
+    def _soft_diagnostics_from_solver(
+        self, solver: cp_model.CpSolver, limit: int = 20
+    ) -> List[str]:
+        # Flatten every slack family into one tagged record list, gather all values with a
+        # single array op and only format the messages that survive the limit.
+        tags: List[str] = []
+        keys: List[Tuple] = []
+        offsets: List[int] = []
+        indices: List[int] = []
+        for tag, slacks in (
+            ("patient_requirement", self.slack_patient_requirements),
+            ("no_same_day", self.slack_no_same_day),
+            ("session_min", self.slack_session_min),
+            ("session_max", self.slack_session_max),
+            ("staffing", self.slack_staffing),
+        ):
+            for key, slack in slacks.items():
+                tags.append(tag)
+                keys.append(key)
+                offsets.append(len(indices))
+                indices.append(slack.Index())
+        for key, slack_list in self.slack_fixed_therapist.items():
+            if not slack_list:
+                continue
+            tags.append("fixed_therapist")
+            keys.append(key)
+            offsets.append(len(indices))
+            indices.extend(slack.Index() for slack in slack_list)
+        if not keys:
+            return []
+        solution = np.asarray(solver.ResponseProto().solution, dtype=np.int64)
+        totals = np.add.reduceat(solution[np.asarray(indices)], np.asarray(offsets))
+        nonzero = np.flatnonzero(totals)
+        messages = [
+            _SLACK_FORMATTERS[tags[pos]](keys[pos], int(totals[pos]))
+            for pos in nonzero[: limit + 1]
+        ]
+        return self._limit_messages(messages, limit=limit, total=len(nonzero))
+
+    def _limit_messages(
+        self, messages: Iterable[str], limit: int = 20, total: Optional[int] = None
+    ) -> List[str]:
+        # Only the first limit + 1 messages are materialized; the rest are just counted.
+        # `total` lets callers pass an already truncated list while keeping the overflow count.
+        iterator = iter(messages)
+        items = list(islice(iterator, limit + 1))
+        if total is None:
+            total = len(items) + sum(1 for _ in iterator)
+        if total <= limit:
             return items
-        return items[:limit] + [f"...and {len(items) - limit} more"]
+        return items[:limit] + [f"...and {total - limit} more"]
 
     def _status_name(self, status_code: int) -> str:
         status_lookup = {
@@ -923,20 +1481,21 @@ class SchedulerModel:
         }
         return status_lookup.get(status_code, "UNKNOWN")
 
-    def _diagnose_infeasibility(self) -> List[str]:
-        messages: List[str] = []
-        # Aggregate feasibility counts per patient/therapy and by day.
-        therapy_slots_total: Dict[Tuple[str, str], int] = {}
-        therapy_slots_by_day: Dict[Tuple[str, str, str], int] = {}
-        therapy_global_slots: Dict[str, int] = {}
-        staff_slots: Dict[Tuple[str, str], int] = {}
-        staff_slots_by_session: Dict[Tuple[str, str, str, int, str], int] = {}
+    def _diagnose_infeasibility(self, limit: int = 20) -> List[str]:
+        messages = self._limit_messages(self._iter_infeasibility_messages(), limit=limit)
+        if not messages:
+            messages.append(
+                "Solver reported infeasible. Consider relaxing constraints "
+                "(availability, max_continuous_hours, therapy staffing, no_same_day_therapies) "
+                "or extending time limit."
+            )
+        return messages
+
+    def _iter_infeasibility_messages(self) -> Iterator[str]:
         rooms_by_therapy: Dict[str, List[str]] = {}
-        required_patients_by_therapy: Dict[str, int] = {}
-        demand_sessions_by_therapy: Dict[str, int] = {}
+        required_patients_by_therapy: Counter[str] = Counter()
+        demand_sessions_by_therapy: Counter[str] = Counter()
         patients_by_therapy: Dict[str, Set[str]] = {}
-        patients_by_session: Dict[SessionKey, Set[str]] = {}
-        therapist_by_id = {therapist.id: therapist for therapist in self.instance.therapists}
 
         for room in self.instance.rooms:
             for therapy_id in room.therapies:
@@ -947,12 +1506,8 @@ class SchedulerModel:
             for therapy_id, required in patient.therapies.items():
                 if required > 0:
                     total_required += required
-                    required_patients_by_therapy[therapy_id] = (
-                        required_patients_by_therapy.get(therapy_id, 0) + 1
-                    )
-                    demand_sessions_by_therapy[therapy_id] = (
-                        demand_sessions_by_therapy.get(therapy_id, 0) + required
-                    )
+                    required_patients_by_therapy[therapy_id] += 1
+                    demand_sessions_by_therapy[therapy_id] += required
                     patients_by_therapy.setdefault(therapy_id, set()).add(patient.id)
             if total_required > 0:
                 available_blocks: Set[Tuple[str, int]] = set()
@@ -963,7 +1518,7 @@ class SchedulerModel:
                     for slot in slots:
                         available_blocks.add((slot.day, slot.block))
                 if total_required > len(available_blocks):
-                    messages.append(
+                    yield (
                         f"Patient {patient.id} requires {total_required} total session(s) but only "
                         f"{len(available_blocks)} available time block(s)."
                     )
@@ -975,176 +1530,172 @@ class SchedulerModel:
             and therapy.min_patients > 0
         }
 
-        for (pid, tid, _rid, day, _block), _var in self.patient_sessions.items():
-            therapy_slots_total[(pid, tid)] = therapy_slots_total.get((pid, tid), 0) + 1
-            therapy_slots_by_day[(pid, tid, day)] = (
-                therapy_slots_by_day.get((pid, tid, day), 0) + 1
-            )
-            therapy_global_slots[tid] = therapy_global_slots.get(tid, 0) + 1
-            patients_by_session.setdefault((tid, _rid, day, _block), set()).add(pid)
-
-        for (_tid, therapy_id, rid, day, block, specialty), _var in self.staffing.items():
-            staff_slots[(therapy_id, specialty)] = staff_slots.get((therapy_id, specialty), 0) + 1
-            staff_slots_by_session[(therapy_id, rid, day, block, specialty)] = (
-                staff_slots_by_session.get((therapy_id, rid, day, block, specialty), 0)
-                + 1
-            )
-
+        # Hashed views for the checks below, all read from the indexes built with the
+        # variables; nothing here walks patient_sessions or staffing again.
+        slots_by_patient_therapy = self._sessions_by_patient_therapy
+        therapies_with_slots = {tid for _pid, tid in slots_by_patient_therapy}
+        staffed_specialties: Set[Tuple[str, str]] = set()
         staffed_sessions: Set[SessionKey] = set()
-        for (therapy_id, room_id, day, block) in self.session_active.keys():
-            therapy_info = self.instance.therapies[therapy_id]
+        for key in self.session_active:
+            therapy_id = key[0]
+            specialty_counts = Counter(
+                spec for _therapist_id, spec, _var in self._staff_by_session.get(key, ())
+            )
+            staffed_specialties.update((therapy_id, spec) for spec in specialty_counts)
             if all(
-                staff_slots_by_session.get((therapy_id, room_id, day, block, specialty), 0)
-                >= required
-                for specialty, required in therapy_info.requirements.items()
+                specialty_counts[specialty] >= required
+                for specialty, required in self.instance.therapies[therapy_id].requirements.items()
             ):
-                staffed_sessions.add((therapy_id, room_id, day, block))
+                staffed_sessions.add(key)
 
-        patient_has_staffed_slot: Dict[Tuple[str, str], bool] = {}
-        for (pid, tid, rid, day, block), _var in self.patient_sessions.items():
-            if (tid, rid, day, block) in staffed_sessions:
-                patient_has_staffed_slot[(pid, tid)] = True
+        patient_has_staffed_slot = {
+            (pid, tid)
+            for (pid, tid), slots in slots_by_patient_therapy.items()
+            if any((tid, rid, day, block) in staffed_sessions for rid, day, block, _var in slots)
+        }
 
         staffed_sessions_by_therapy: Dict[str, List[SessionKey]] = {}
         for key in staffed_sessions:
             staffed_sessions_by_therapy.setdefault(key[0], []).append(key)
 
         patient_count_by_session = {
-            key: len(patients) for key, patients in patients_by_session.items()
+            key: len(patients) for key, patients in self._psess_by_session.items()
         }
 
+        # Patients sharing a fixed-therapist configuration are validated once per group;
+        # only the slot overlap check depends on the individual patient.
+        patients_by_fixed_config: DefaultDict[Tuple, List[Patient]] = defaultdict(list)
         for patient in self.instance.patients:
-            for therapy_id, fixed in patient.fixed_therapists.items():
-                if not fixed:
-                    continue
+            config = tuple(
+                (
+                    therapy_id,
+                    tuple(
+                        (specialty, tuple(ids) if isinstance(ids, list) else (ids,))
+                        for specialty, ids in fixed.items()
+                    ),
+                )
+                for therapy_id, fixed in patient.fixed_therapists.items()
+                if fixed
+            )
+            if config:
+                patients_by_fixed_config[config].append(patient)
+
+        for config, group in patients_by_fixed_config.items():
+            for therapy_id, fixed in config:
                 therapy_info = self.instance.therapies.get(therapy_id)
                 if not therapy_info:
-                    messages.append(
-                        f"Patient {patient.id} fixes therapists for unknown therapy '{therapy_id}'."
-                    )
+                    for patient in group:
+                        yield (
+                            f"Patient {patient.id} fixes therapists for unknown therapy '{therapy_id}'."
+                        )
                     continue
-                for specialty, therapist_ids in fixed.items():
-                    if not therapist_ids:
-                        continue
-                    ids = therapist_ids if isinstance(therapist_ids, list) else [therapist_ids]
-                    ids = [tid for tid in ids if tid]
+                for specialty, therapist_ids in fixed:
+                    ids = [tid for tid in therapist_ids if tid]
                     if not ids:
                         continue
                     required_count = therapy_info.requirements.get(specialty, 0)
                     if required_count == 0:
-                        messages.append(
-                            f"Patient {patient.id} fixes '{specialty}' for '{therapy_id}', "
-                            "but the therapy does not require that specialty."
-                        )
+                        for patient in group:
+                            yield (
+                                f"Patient {patient.id} fixes '{specialty}' for '{therapy_id}', "
+                                "but the therapy does not require that specialty."
+                            )
                         continue
-                    if len(ids) > required_count:
-                        messages.append(
-                            f"Patient {patient.id} fixes {len(ids)} '{specialty}' therapist(s) for '{therapy_id}', "
-                            f"but only {required_count} required."
-                        )
-                    if len(set(ids)) != len(ids):
-                        messages.append(
-                            f"Patient {patient.id} repeats a therapist for '{therapy_id}' ({specialty})."
-                        )
+                    for patient in group:
+                        if len(ids) > required_count:
+                            yield (
+                                f"Patient {patient.id} fixes {len(ids)} '{specialty}' therapist(s) for '{therapy_id}', "
+                                f"but only {required_count} required."
+                            )
+                        if len(set(ids)) != len(ids):
+                            yield (
+                                f"Patient {patient.id} repeats a therapist for '{therapy_id}' ({specialty})."
+                            )
                     for therapist_id in ids:
-                        therapist = therapist_by_id.get(therapist_id)
+                        therapist = self._therapists_by_id.get(therapist_id)
                         if not therapist:
-                            messages.append(
-                                f"Patient {patient.id} fixes therapist '{therapist_id}' for '{therapy_id}', "
-                                "but that therapist does not exist."
-                            )
+                            for patient in group:
+                                yield (
+                                    f"Patient {patient.id} fixes therapist '{therapist_id}' for '{therapy_id}', "
+                                    "but that therapist does not exist."
+                                )
                             continue
                         if specialty not in therapist.specialties:
-                            messages.append(
-                                f"Therapist {therapist_id} lacks specialty '{specialty}' required by "
-                                f"patient {patient.id} for '{therapy_id}'."
-                            )
+                            for patient in group:
+                                yield (
+                                    f"Therapist {therapist_id} lacks specialty '{specialty}' required by "
+                                    f"patient {patient.id} for '{therapy_id}'."
+                                )
                             continue
-                        has_slot = False
-                        for (pid, tid, rid, day, block), _var in self.patient_sessions.items():
-                            if pid != patient.id or tid != therapy_id:
-                                continue
-                            staff_key = (
-                                therapist_id,
-                                therapy_id,
-                                rid,
-                                day,
-                                block,
-                                specialty,
-                            )
-                            if staff_key in self.staffing:
-                                has_slot = True
-                                break
-                        if not has_slot:
-                            messages.append(
-                                f"Patient {patient.id} requires therapist {therapist_id} for '{therapy_id}' "
-                                f"({specialty}), but there are no slots where both are available in compatible rooms."
+                        for patient in group:
+                            has_slot = any(
+                                (therapist_id, therapy_id, rid, day, block, specialty) in self.staffing
+                                for rid, day, block, _var in slots_by_patient_therapy.get(
+                                    (patient.id, therapy_id), ()
+                                )
                             )
+                            if not has_slot:
+                                yield (
+                                    f"Patient {patient.id} requires therapist {therapist_id} for '{therapy_id}' "
+                                    f"({specialty}), but there are no slots where both are available in compatible rooms."
+                                )
 
         for patient in self.instance.patients:
             for therapy_id, slots in patient.pinned_sessions.items():
                 for slot in slots:
                     has_slot = any(
-                        pid == patient.id
-                        and tid == therapy_id
-                        and day == slot.day
-                        and block == slot.block
-                        for (pid, tid, _rid, day, block), _var in self.patient_sessions.items()
+                        tid == therapy_id
+                        for tid, _var in self._sessions_by_patient_slot.get(
+                            (patient.id, slot.day, slot.block), ()
+                        )
                     )
                     if not has_slot:
-                        messages.append(
+                        yield (
                             f"Patient {patient.id} pins '{therapy_id}' on {slot.day} {block_to_range(slot.block)}, "
                             "but no feasible slot exists."
                         )
 
         for patient in self.instance.patients:
+            availability_blocks = sum(len(blocks) for blocks in patient.availability.values())
             for therapy_id, required in patient.therapies.items():
                 if required <= 0:
                     continue
-                if not patient_has_staffed_slot.get((patient.id, therapy_id), False):
-                    messages.append(
+                if (patient.id, therapy_id) not in patient_has_staffed_slot:
+                    yield (
                         f"Patient {patient.id} has no feasible staff+room overlap for "
                         f"therapy '{therapy_id}'."
                     )
                 rooms_for_therapy = rooms_by_therapy.get(therapy_id, [])
-                availability_blocks = sum(
-                    len(blocks) for blocks in patient.availability.values()
-                )
-                total_slots = therapy_slots_total.get((patient.id, therapy_id), 0)
+                patient_slots = slots_by_patient_therapy.get((patient.id, therapy_id), ())
+                total_slots = len(patient_slots)
                 if total_slots < required:
                     if total_slots == 0:
                         if not rooms_for_therapy:
-                            messages.append(
+                            yield (
                                 f"Patient {patient.id} needs '{therapy_id}', but no rooms allow this therapy."
                             )
                         if availability_blocks == 0:
-                            messages.append(
+                            yield (
                                 f"Patient {patient.id} has no availability blocks to schedule '{therapy_id}'."
                             )
                     if total_slots > 0 or (rooms_for_therapy and availability_blocks > 0):
-                        day_counts = {
-                            day: therapy_slots_by_day.get((patient.id, therapy_id, day), 0)
-                            for day in DAY_ORDER
-                        }
+                        slots_by_day = Counter(day for _rid, day, _block, _var in patient_slots)
+                        day_counts = {day: slots_by_day[day] for day in DAY_ORDER}
                         available_days = (
                             ", ".join(f"{d}:{c}" for d, c in day_counts.items() if c > 0)
                             or "none"
                         )
-                        messages.append(
+                        yield (
                             f"Patient {patient.id} needs {required} '{therapy_id}' sessions but only "
                             f"{total_slots} feasible slots exist (by day {available_days})."
                         )
                 else:
                     if therapy_id in patient.no_same_day_therapies:
-                        max_per_week_with_rule = sum(
-                            min(
-                                1,
-                                therapy_slots_by_day.get((patient.id, therapy_id, day), 0),
-                            )
-                            for day in DAY_ORDER
+                        max_per_week_with_rule = len(
+                            {day for _rid, day, _block, _var in patient_slots}
                         )
                         if max_per_week_with_rule < required:
-                            messages.append(
+                            yield (
                                 f"Patient {patient.id} has 'no_same_day' for '{therapy_id}', allowing at most "
                                 f"{max_per_week_with_rule} sessions per week but requires {required}."
                             )
@@ -1154,20 +1705,20 @@ class SchedulerModel:
                 continue
             rooms_for_therapy = rooms_by_therapy.get(therapy_id, [])
             if not rooms_for_therapy:
-                messages.append(
+                yield (
                     f"Therapy '{therapy_id}' is not allowed in any room."
                 )
                 continue
             if (
-                therapy_global_slots.get(therapy_id, 0) == 0
+                therapy_id not in therapies_with_slots
                 and required_patients_by_therapy.get(therapy_id, 0) > 0
             ):
-                messages.append(
+                yield (
                     f"No feasible slots for therapy '{therapy_id}' with current patient availability."
                 )
             for specialty in therapy.requirements.keys():
-                if staff_slots.get((therapy_id, specialty), 0) == 0:
-                    messages.append(
+                if (therapy_id, specialty) not in staffed_specialties:
+                    yield (
                         f"No feasible staff slots for therapy '{therapy_id}' specialty '{specialty}'."
                     )
             demand_sessions = demand_sessions_by_therapy.get(therapy_id, 0)
@@ -1175,13 +1726,13 @@ class SchedulerModel:
                 continue
             staffed_sessions_for_therapy = staffed_sessions_by_therapy.get(therapy_id, [])
             if not staffed_sessions_for_therapy:
-                messages.append(
+                yield (
                     f"Therapy '{therapy_id}' has no staffed slots where all required specialties overlap."
                 )
                 continue
             unique_patients = len(patients_by_therapy.get(therapy_id, set()))
             if unique_patients < therapy.min_patients:
-                messages.append(
+                yield (
                     f"Therapy '{therapy_id}' requires at least {therapy.min_patients} patient(s) "
                     f"per session but only {unique_patients} patient(s) request it."
                 )
@@ -1195,7 +1746,7 @@ class SchedulerModel:
                 default=0,
             )
             if slots_with_min == 0:
-                messages.append(
+                yield (
                     f"Therapy '{therapy_id}' needs at least {therapy.min_patients} patient(s) per session "
                     f"but the max available at any staffed slot is {max_available}."
                 )
@@ -1206,7 +1757,7 @@ class SchedulerModel:
                     if patient_count_by_session.get(key, 0) >= 1
                 )
                 if demand_sessions > slots_with_any:
-                    messages.append(
+                    yield (
                         f"Therapy '{therapy_id}' needs {demand_sessions} 1:1 session(s) but only "
                         f"{slots_with_any} staffed slot(s) have any available patient."
                     )
@@ -1216,22 +1767,14 @@ class SchedulerModel:
                     for key in staffed_sessions_for_therapy
                 )
                 if capacity_upper < demand_sessions:
-                    messages.append(
+                    yield (
                         f"Therapy '{therapy_id}' demand {demand_sessions} exceeds "
                         f"the upper bound capacity {capacity_upper} across staffed slots."
                     )
                 if slots_with_min > 0:
                     min_sessions = (demand_sessions + therapy.max_patients - 1) // therapy.max_patients
                     if slots_with_min < min_sessions:
-                        messages.append(
+                        yield (
                             f"Therapy '{therapy_id}' needs at least {min_sessions} session(s) but only "
                             f"{slots_with_min} staffed slot(s) meet the minimum patients."
                         )
-
-        if not messages:
-            messages.append(
-                "Solver reported infeasible. Consider relaxing constraints "
-                "(availability, max_continuous_hours, therapy staffing, no_same_day_therapies) "
-                "or extending time limit."
-            )
-        return messages
@@ -2,17 +2,36 @@ from __future__ import annotations
 
 import json
 import os
-import re
+import string
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 
 class StorageError(RuntimeError):
     pass
 
 
-_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_ID_CHARS = frozenset(string.ascii_letters + string.digits + "_-")
+_ID_MAX_LENGTH = 64
+_PATH_CACHE_SIZE = 1024
+_GCS_MAX_WORKERS = 16
+_GCS_LIST_PAGE_SIZE = 1000
+_GCS_CLIENTS: Dict[Tuple[str, str], Any] = {}
+# One pool for every GCSStorage instance, created on first batch call and kept for the
+# life of the process, so dropped instances never strand their own threads.
+_GCS_POOL: Optional[ThreadPoolExecutor] = None
+_GCS_POOL_LOCK = threading.Lock()
+
+try:
+    from google.api_core.exceptions import NotFound
+except ImportError:
+
+    class NotFound(Exception):  # type: ignore[no-redef]
+        """Placeholder when the GCS client libraries are not installed."""
 
 
 @dataclass(frozen=True)
@@ -23,6 +42,7 @@ class StorageSettings:
     gcs_prefix: str
 
 
+@lru_cache(maxsize=1)
 def load_storage_settings() -> StorageSettings:
     backend = os.getenv("SCHEDULER_STORAGE_BACKEND", "local").lower().strip()
     local_root = Path(os.getenv("SCHEDULER_STORAGE_ROOT", "output"))
@@ -36,8 +56,26 @@ def load_storage_settings() -> StorageSettings:
     )
 
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode_json(payload: object) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, indent=2).encode("utf-8")
+
+
+def decode_json(data: bytes) -> object:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def validate_id(value: str, label: str) -> str:
-    if not _ID_RE.match(value):
+    if not 1 <= len(value) <= _ID_MAX_LENGTH or not _ID_CHARS.issuperset(value):
         raise ValueError(f"Invalid {label}: {value!r}")
     return value
 
@@ -61,6 +99,9 @@ class BaseStorage:
     def read_bytes(self, key: str) -> bytes:
         raise NotImplementedError
 
+    def try_read_bytes(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
     def exists(self, key: str) -> bool:
         raise NotImplementedError
 
@@ -70,65 +111,143 @@ class BaseStorage:
     def delete(self, key: str) -> None:
         raise NotImplementedError
 
+    def write_many(self, items: Sequence[Tuple[str, bytes, Optional[str]]]) -> None:
+        for key, data, content_type in items:
+            self.write_bytes(key, data, content_type=content_type)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.delete(key)
+
     def write_json(self, key: str, payload: object) -> None:
-        self.write_text(key, json.dumps(payload, indent=2), content_type="application/json")
+        self.write_bytes(key, encode_json(payload), content_type="application/json")
 
     def read_json(self, key: str) -> object:
-        return json.loads(self.read_text(key))
+        return decode_json(self.read_bytes(key))
+
+    def try_read_text(self, key: str) -> Optional[str]:
+        data = self.try_read_bytes(key)
+        return None if data is None else data.decode("utf-8")
+
+    def try_read_json(self, key: str) -> Optional[object]:
+        data = self.try_read_bytes(key)
+        return None if data is None else decode_json(data)
 
 
 class LocalStorage(BaseStorage):
     def __init__(self, root: Path) -> None:
         self.root = root
-
-    def _path(self, key: str) -> Path:
-        path = Path(key)
-        if path.is_absolute() or ".." in path.parts:
+        self._root_str = os.fspath(root)
+        # Resolved keys and directories already created, so repeated writes into the
+        # same session prefix skip path building and mkdir syscalls.
+        self._path = lru_cache(maxsize=_PATH_CACHE_SIZE)(self._resolve_path)
+        self._known_dirs: Set[str] = set()
+
+    def _resolve_path(self, key: str) -> str:
+        # Keys are forward-slash relative; validate them as strings and join once.
+        if key.startswith(("/", "\\")) or ".." in key.split("/"):
             raise StorageError(f"Invalid storage key: {key}")
-        return self.root / path
+        return os.path.join(self._root_str, key)
 
-    def write_text(self, key: str, text: str, content_type: Optional[str] = None) -> None:
+    def _key(self, path: str) -> str:
+        return os.path.relpath(path, self._root_str).replace(os.sep, "/")
+
+    def _open_for_write(self, key: str) -> BinaryIO:
         path = self._path(key)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(text)
+        parent = os.path.dirname(path)
+        if parent not in self._known_dirs:
+            os.makedirs(parent, exist_ok=True)
+            if len(self._known_dirs) >= _PATH_CACHE_SIZE:
+                self._known_dirs.clear()
+            self._known_dirs.add(parent)
+        try:
+            return open(path, "wb")
+        except FileNotFoundError:
+            # The directory was removed behind our back; recreate it once.
+            self._known_dirs.discard(parent)
+            os.makedirs(parent, exist_ok=True)
+            return open(path, "wb")
+
+    def _write(self, key: str, data: bytes) -> None:
+        with self._open_for_write(key) as handle:
+            handle.write(data)
+
+    def _read(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as handle:
+            return handle.read()
+
+    def write_text(self, key: str, text: str, content_type: Optional[str] = None) -> None:
+        self._write(key, text.encode("utf-8"))
 
     def read_text(self, key: str) -> str:
-        return self._path(key).read_text()
+        return self._read(key).decode("utf-8")
 
     def write_bytes(self, key: str, data: bytes, content_type: Optional[str] = None) -> None:
-        path = self._path(key)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_bytes(data)
+        self._write(key, data)
 
     def read_bytes(self, key: str) -> bytes:
-        return self._path(key).read_bytes()
+        return self._read(key)
+
+    def try_read_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            return self._read(key)
+        except FileNotFoundError:
+            return None
 
     def exists(self, key: str) -> bool:
-        return self._path(key).exists()
+        return os.path.exists(self._path(key))
 
     def list_prefix(self, prefix: str) -> List[str]:
         root = self._path(prefix)
-        if not root.exists():
+        if not os.path.exists(root):
             return []
-        if root.is_file():
-            return [str(root.relative_to(self.root))]
+        if os.path.isfile(root):
+            return [self._key(root)]
+        # Walk with scandir: DirEntry type checks reuse the readdir data, and keys are
+        # built as strings without a Path per entry.
         keys: List[str] = []
-        for path in root.rglob("*"):
-            if path.is_file():
-                keys.append(str(path.relative_to(self.root)))
+        pending = [root]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file():
+                        keys.append(self._key(entry.path))
         return keys
 
     def delete(self, key: str) -> None:
-        path = self._path(key)
-        if path.exists():
-            path.unlink()
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            return
+
+
+def _gcs_pool() -> ThreadPoolExecutor:
+    # Each GCS request is a blocking HTTPS round-trip; batch calls overlap them here.
+    global _GCS_POOL
+    with _GCS_POOL_LOCK:
+        if _GCS_POOL is None:
+            _GCS_POOL = ThreadPoolExecutor(
+                max_workers=_GCS_MAX_WORKERS, thread_name_prefix="gcs-storage"
+            )
+        return _GCS_POOL
 
 
 class GCSStorage(BaseStorage):
     def __init__(self, bucket_name: str, prefix: str = "") -> None:
-        from google.cloud import storage
-
-        self.client = storage.Client()
+        # Client() resolves credentials (possibly via the metadata server); share one
+        # per credentials/project pair for the life of the process.
+        cache_key = (
+            os.getenv("GOOGLE_APPLICATION_CREDENTIALS", ""),
+            os.getenv("GOOGLE_CLOUD_PROJECT", ""),
+        )
+        client = _GCS_CLIENTS.get(cache_key)
+        if client is None:
+            from google.cloud import storage
+
+            client = _GCS_CLIENTS.setdefault(cache_key, storage.Client())
+        self.client = client
         self.bucket = self.client.bucket(bucket_name)
         self.prefix = prefix.strip("/")
 
@@ -155,6 +274,27 @@ class GCSStorage(BaseStorage):
         blob = self.bucket.blob(self._blob_name(key))
         return blob.download_as_bytes()
 
+    def try_read_bytes(self, key: str) -> Optional[bytes]:
+        blob = self.bucket.blob(self._blob_name(key))
+        try:
+            return blob.download_as_bytes()
+        except NotFound:
+            return None
+
+    def write_many(self, items: Sequence[Tuple[str, bytes, Optional[str]]]) -> None:
+        self._run_all(
+            _gcs_pool().submit(self.write_bytes, key, data, content_type)
+            for key, data, content_type in items
+        )
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        self._run_all(_gcs_pool().submit(self.delete, key) for key in keys)
+
+    @staticmethod
+    def _run_all(futures: Iterable[Future]) -> None:
+        for future in as_completed(list(futures)):
+            future.result()
+
     def exists(self, key: str) -> bool:
         blob = self.bucket.blob(self._blob_name(key))
         return blob.exists()
@@ -163,20 +303,20 @@ class GCSStorage(BaseStorage):
         if prefix.startswith("/"):
             raise StorageError(f"Invalid storage key: {prefix}")
         blob_prefix = self._blob_name(prefix)
-        keys: List[str] = []
-        for blob in self.client.list_blobs(self.bucket, prefix=blob_prefix):
-            name = blob.name
-            if self.prefix:
-                prefix_root = f"{self.prefix}/"
-                if not name.startswith(prefix_root):
-                    continue
-                name = name[len(prefix_root) :]
-            keys.append(name)
-        return keys
+        # Only names are used: request the largest page and skip the rest of the metadata.
+        blobs = self.client.list_blobs(
+            self.bucket,
+            prefix=blob_prefix,
+            page_size=_GCS_LIST_PAGE_SIZE,
+            fields="items/name,nextPageToken",
+        )
+        if not self.prefix:
+            return [blob.name for blob in blobs]
+        # blob_prefix starts with "<prefix>/", so every listed name does too.
+        prefix_len = len(self.prefix) + 1
+        return [blob.name[prefix_len:] for blob in blobs]
 
     def delete(self, key: str) -> None:
-        from google.api_core.exceptions import NotFound
-
         blob = self.bucket.blob(self._blob_name(key))
         try:
             blob.delete()
@@ -184,6 +324,7 @@ class GCSStorage(BaseStorage):
             return
 
 
+@lru_cache(maxsize=8)
 def get_storage(settings: Optional[StorageSettings] = None) -> BaseStorage:
     settings = settings or load_storage_settings()
     if settings.backend == "local":
@@ -193,3 +334,9 @@ def get_storage(settings: Optional[StorageSettings] = None) -> BaseStorage:
             raise StorageError("SCHEDULER_GCS_BUCKET is required for gcs storage backend.")
         return GCSStorage(settings.gcs_bucket, settings.gcs_prefix)
     raise StorageError(f"Unknown storage backend: {settings.backend}")
+
+
+def reset_storage_cache() -> None:
+    """Forget cached settings and backends, e.g. after changing SCHEDULER_* env vars."""
+    load_storage_settings.cache_clear()
+    get_storage.cache_clear()
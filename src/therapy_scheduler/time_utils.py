@@ -1,26 +1,30 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Sequence, Set
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Sequence, Set, Tuple
 
 DAY_ORDER: List[str] = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
 
 # Nine one-hour blocks (08-13, break, 14-18)
 BLOCKS: List[int] = list(range(9))
-BLOCK_TO_RANGE: Dict[int, str] = {
-    0: "08:00-09:00",
-    1: "09:00-10:00",
-    2: "10:00-11:00",
-    3: "11:00-12:00",
-    4: "12:00-13:00",
-    5: "14:00-15:00",
-    6: "15:00-16:00",
-    7: "16:00-17:00",
-    8: "17:00-18:00",
-}
-
-
-@dataclass(frozen=True)
+# Indexed by block; BLOCK_TO_RANGE mirrors it as a dict.
+_RANGE_STRINGS: Tuple[str, ...] = (
+    "08:00-09:00",
+    "09:00-10:00",
+    "10:00-11:00",
+    "11:00-12:00",
+    "12:00-13:00",
+    "14:00-15:00",
+    "15:00-16:00",
+    "16:00-17:00",
+    "17:00-18:00",
+)
+BLOCK_TO_RANGE: Dict[int, str] = dict(enumerate(_RANGE_STRINGS))
+RANGE_TO_BLOCK: Dict[str, int] = {v: k for k, v in BLOCK_TO_RANGE.items()}
+
+
+@dataclass(frozen=True, slots=True)
 class Interval:
     start_minutes: int
     end_minutes: int
@@ -40,60 +44,110 @@ class Interval:
 
 
 def _to_minutes(clock: str) -> int:
+    # Canonical "HH:MM" is read digit by digit; anything else goes through split/int.
+    if (
+        len(clock) == 5
+        and clock[2] == ":"
+        and clock.isascii()
+        and clock[:2].isdigit()
+        and clock[3:].isdigit()
+    ):
+        return (
+            (ord(clock[0]) - 48) * 600
+            + (ord(clock[1]) - 48) * 60
+            + (ord(clock[3]) - 48) * 10
+            + (ord(clock[4]) - 48)
+        )
     hours, minutes = clock.split(":")
     return int(hours) * 60 + int(minutes)
 
 
+_BLOCK_MINUTES: Tuple[Interval, ...] = tuple(
+    Interval(hour * 60, (hour + 1) * 60) for hour in (8, 9, 10, 11, 12, 14, 15, 16, 17)
+)
+_BLOCK_BOUNDS: Tuple[Tuple[int, int], ...] = tuple(
+    (interval.start_minutes, interval.end_minutes) for interval in _BLOCK_MINUTES
+)
+# Lunch break sits between 4 and 5, so treat them as separate streaks.
+_SEGMENTS: Tuple[Tuple[int, ...], ...] = ((0, 1, 2, 3, 4), (5, 6, 7, 8))
+
+
 def block_minutes(block: int) -> Interval:
     """Get the start/end minutes for a block."""
-    mapping = {
-        0: Interval(8 * 60, 9 * 60),
-        1: Interval(9 * 60, 10 * 60),
-        2: Interval(10 * 60, 11 * 60),
-        3: Interval(11 * 60, 12 * 60),
-        4: Interval(12 * 60, 13 * 60),
-        5: Interval(14 * 60, 15 * 60),
-        6: Interval(15 * 60, 16 * 60),
-        7: Interval(16 * 60, 17 * 60),
-        8: Interval(17 * 60, 18 * 60),
-    }
-    return mapping[block]
+    return _BLOCK_MINUTES[block]
 
 
 def block_to_range(block: int) -> str:
-    return BLOCK_TO_RANGE[block]
+    # Tuple indexing would wrap negative blocks around; reject any out-of-range block
+    # with the KeyError the old dict lookup raised.
+    if not 0 <= block < len(_RANGE_STRINGS):
+        raise KeyError(block)
+    return _RANGE_STRINGS[block]
 
 
 def range_to_block(range_str: str) -> int:
-    inverted = {v: k for k, v in BLOCK_TO_RANGE.items()}
-    if range_str not in inverted:
+    block = RANGE_TO_BLOCK.get(range_str)
+    if block is None:
         raise ValueError(f"Unknown time range '{range_str}'.")
-    return inverted[range_str]
+    return block
+
+
+@lru_cache(maxsize=1024)
+def _interval_mask(interval_str: str) -> int:
+    # Availability files repeat the same few ranges, so each string is parsed once.
+    # The grid is fixed, so compare raw minute bounds instead of building Intervals.
+    start_str, end_str = interval_str.split("-")
+    start, end = _to_minutes(start_str), _to_minutes(end_str)
+    mask = 0
+    for bit, (block_start, block_end) in enumerate(_BLOCK_BOUNDS):
+        if start <= block_start and block_end <= end:
+            mask |= 1 << bit
+    return mask
+
+
+def intervals_to_block_mask(intervals: Iterable[str]) -> int:
+    """Convert interval strings to a bitmask with bit b set when block b is covered."""
+    mask = 0
+    for interval_str in intervals:
+        mask |= _interval_mask(interval_str)
+    return mask
+
+
+def blocks_from_mask(mask: int) -> Set[int]:
+    """Decode a block bitmask into the set of block indices."""
+    return {b for b in BLOCKS if mask >> b & 1}
+
+
+@lru_cache(maxsize=1 << len(BLOCKS))
+def _frozen_blocks(mask: int) -> FrozenSet[int]:
+    # Only 512 masks exist, so days with the same availability share one frozenset.
+    return frozenset(b for b in BLOCKS if mask >> b & 1)
 
 
 def intervals_to_block_set(intervals: Iterable[str]) -> Set[int]:
     """Convert a list of interval strings to the set of hour block indices they cover."""
-    interval_objs = [Interval.parse(i) for i in intervals]
-    return {
-        b
-        for b in BLOCKS
-        if any(interval.contains_block(b) for interval in interval_objs)
-    }
+    return blocks_from_mask(intervals_to_block_mask(intervals))
 
 
-def availability_to_blocks_per_day(
-    avail_map: Dict[str, Sequence[str]],
-) -> Dict[str, Set[int]]:
-    """Normalize availability dict of day -> intervals into day -> blocks set."""
-    normalized: Dict[str, Set[int]] = {}
+def availability_to_block_masks(avail_map: Dict[str, Sequence[str]]) -> Dict[str, int]:
+    """Normalize availability dict of day -> intervals into day -> block bitmask."""
+    normalized: Dict[str, int] = {}
     for day, intervals in avail_map.items():
         if not intervals:
             continue
-        normalized[day] = intervals_to_block_set(intervals)
+        normalized[day] = intervals_to_block_mask(intervals)
     return normalized
 
 
-def consecutive_segments() -> List[List[int]]:
+def availability_to_blocks_per_day(
+    avail_map: Dict[str, Sequence[str]],
+) -> Dict[str, FrozenSet[int]]:
+    """Normalize availability dict of day -> intervals into day -> frozen blocks set."""
+    return {
+        day: _frozen_blocks(mask) for day, mask in availability_to_block_masks(avail_map).items()
+    }
+
+
+def consecutive_segments() -> Tuple[Tuple[int, ...], ...]:
     """Return segments of blocks that are consecutive in time (morning vs afternoon)."""
-    # Lunch break sits between 4 and 5, so treat them as separate streaks.
-    return [list(range(0, 5)), list(range(5, 9))]
+    return _SEGMENTS